@@ -88,14 +88,18 @@ purity = float(abs((rho_final * rho_final).tr()))
 
 # von Neumann entropy (entanglement measure)
 try:
-    entropy = float(abs(qt.entropy_vn(rho_final)))
+    evals_final = np.linalg.eigvalsh(rho_final.full())
+    evals_final = evals_final[evals_final > 1e-12]
+    entropy = float(abs(-np.sum(evals_final * np.log(evals_final))))
 except:
     entropy = 0.0
 
 # Entanglement between subsystems (A1 vs B2C2)
 try:
     rho_A1 = rho_final.ptrace([0])
-    entropy_subsystem = float(abs(qt.entropy_vn(rho_A1)))
+    evals_A1 = np.linalg.eigvalsh(rho_A1.full())
+    evals_A1 = evals_A1[evals_A1 > 1e-12]
+    entropy_subsystem = float(abs(-np.sum(evals_A1 * np.log(evals_A1))))
 except:
     entropy_subsystem = 0.0
 
@@ -143,7 +143,6 @@ psi = beam_splitter_4mode(0, 1, theta_output, num_modes, cutoff_dim) * psi
 psi = beam_splitter_4mode(1, 2, theta_output, num_modes, cutoff_dim) * psi
 psi = beam_splitter_4mode(2, 3, theta_output, num_modes, cutoff_dim) * psi
 
-psi = psi.unit()
 
 # Calculate probabilities
 output_probs_sim = {}
@@ -52,7 +52,6 @@ def pbs_measurement(state, hwp_angle, extinction_ratio):
     # Apply Bob's basis selector HWP
     hwp = hwp_operator(hwp_angle)
     rotated_state = hwp * state
-    rotated_state = rotated_state.unit()
     
     # Ideal measurement probabilities for H (detector 0) and V (detector 1)
     # Use overlap method to get proper scalar value
@@ -108,7 +107,6 @@ for alice_prep, alice_angle in alice_encoding_angles.items():
     # Apply Alice's encoding HWP
     alice_hwp = hwp_operator(alice_angle)
     encoded_state = alice_hwp * initial_state
-    encoded_state = encoded_state.unit()
     
     # Step 2: Transmission through quantum channel
     # Model as amplitude damping (photon loss)
@@ -25,7 +25,7 @@ theta_rad = np.radians(hwp_angle)
 hwp_matrix = np.array([[np.cos(2*theta_rad), np.sin(2*theta_rad)],
                        [np.sin(2*theta_rad), -np.cos(2*theta_rad)]])
 hwp_op_a = qt.tensor(qt.Qobj(hwp_matrix), qt.qeye(2))
-hwp_state = (hwp_op_a * filtered_state).unit()
+hwp_state = hwp_op_a * filtered_state
 
 # Step 4: Polarizing beam splitter separates H and V polarizations
 # PBS transmits H, reflects V - creates spatial separation but preserves entanglement
@@ -60,7 +60,9 @@ fidelity_to_bell = float(abs(qt.fidelity(spdc_state, target_bell)))
 # Entanglement measure: von Neumann entropy of reduced state
 rho_total = spdc_state * spdc_state.dag()
 rho_a = rho_total.ptrace(0)  # Trace out mode B
-entropy_a = float(abs(qt.entropy_vn(rho_a)))
+evals_a = np.linalg.eigvalsh(rho_a.full())
+evals_a = evals_a[evals_a > 1e-12]
+entropy_a = float(abs(-np.sum(evals_a * np.log(evals_a))))
 
 # Photon detection probabilities
 # Probability of detecting H in mode A
@@ -103,7 +103,9 @@ rho_total = separated_state * separated_state.dag()
 rho_a = rho_total.ptrace(0)  # Reduced state of mode A
 
 # Entanglement entropy
-entropy_a = float(abs(qt.entropy_vn(rho_a)))
+evals_a = np.linalg.eigvalsh(rho_a.full())
+evals_a = evals_a[evals_a > 1e-12]
+entropy_a = float(abs(-np.sum(evals_a * np.log(evals_a))))
 
 # State purity
 purity = float(abs((rho_total * rho_total).tr()))
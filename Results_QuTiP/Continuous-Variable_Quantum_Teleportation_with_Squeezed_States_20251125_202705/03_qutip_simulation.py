@@ -37,7 +37,6 @@ S_tms = (-1j * H_tms).expm()
 
 vac_vac = qt.tensor(qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 0))
 epr_state = S_tms * vac_vac
-epr_state = epr_state.unit()
 
 # Step 2: Prepare input coherent state to be teleported
 input_state = qt.coherent(cutoff_dim, alpha_input)
@@ -57,7 +56,6 @@ H_bell_bs = theta_bs * (a0.dag() * a1 + a0 * a1.dag())
 U_bell_bs = (-1j * H_bell_bs).expm()
 
 alice_bob_state = U_bell_bs * alice_bob_state
-alice_bob_state = alice_bob_state.unit()
 
 # Step 5: Homodyne measurements with feedforward (Monte Carlo simulation)
 # Define quadrature operators for modes 0 and 1
@@ -3,8 +3,37 @@
 # Corrected approach: Start with photons at interferometer inputs → Apply BS1 → Apply phase shifts → Apply BS2 → Detect
 # Using 6 modes: signal_in, signal_short, signal_long, idler_in, idler_short, idler_long
 
+import sys
+from functools import lru_cache
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
+from scipy.linalg import expm
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import basis_ket, bs_unitary_2mode
+
+def coincidence_scan(psi_ab, U_bs2_sig, U_bs2_idl, n_long_diag, coincidence_diag, phis):
+    """Coincidence rate after long-arm phase phi and BS2, for each phi in phis.
+
+    The phase is diagonal, so all phases are applied as one (len(phis), dim) grid and pushed
+    through both BS2 matrices in batched products. Runs in the precision of psi_ab
+    (complex64 or complex128).
+    """
+    phase_grid = np.exp(1j * np.outer(phis, n_long_diag)).astype(psi_ab.dtype)
+    states = (phase_grid * psi_ab) @ U_bs2_sig.T @ U_bs2_idl.T
+    return (states.conj() * states).real @ coincidence_diag
+
+
+def sector_expm(H_mat, photon_numbers):
+    """exp(-iH) for a number-conserving H, exponentiating one photon-number block at a time."""
+    U = np.zeros(H_mat.shape, dtype=complex)
+    for n in np.unique(photon_numbers):
+        block = np.ix_(photon_numbers == n, photon_numbers == n)
+        U[block] = expm(-1j * H_mat[block])
+    return U
+
 
 # Extract parameters from designer's specification
 cutoff_dim = 2  # Single photon per mode is sufficient
@@ -12,13 +41,21 @@ wavelength_pump = 405  # nm
 wavelength_signal = 810  # nm
 wavelength_idler = 810  # nm
 
+# Single-mode operators, built once and embedded on demand
+I = qt.qeye(cutoff_dim)
+A = qt.destroy(cutoff_dim)
+
+
+@lru_cache(maxsize=None)
+def mode_a(site, n_modes):
+    """Annihilation operator acting on `site` of an n_modes tensor space."""
+    return qt.tensor(*[A if j == site else I for j in range(n_modes)])
+
+
 # Step 1: Initialize state with photons at interferometer input ports
 # 6 modes: [signal_in, signal_short, signal_long, idler_in, idler_short, idler_long]
 # Initial state from SPDC: |1_signal_in, 0, 0, 1_idler_in, 0, 0⟩
-vac = qt.fock(cutoff_dim, 0)
-one = qt.fock(cutoff_dim, 1)
-
-psi_initial = qt.tensor(one, vac, vac, one, vac, vac)
+psi_initial = basis_ket(cutoff_dim, (1, 0, 0, 1, 0, 0))
 
 # Step 2: Construct BS1 operators (input beam splitters)
 # BS1 Signal: couples signal_in (mode 0) to signal_short (mode 1) and signal_long (mode 2)
@@ -26,80 +63,66 @@ psi_initial = qt.tensor(one, vac, vac, one, vac, vac)
 
 theta_bs = np.pi/4  # 50:50 beam splitter
 
-# For BS1 Signal: need to split input into short and long arms
+# Each beam splitter only touches its own 3-mode subsystem and conserves photon
+# number there, so exponentiate it within the 3-mode space (d**3 states) sector by
+# sector and embed it next to an identity on the other subsystem.
+dim_3mode = cutoff_dim**3
+n_3mode = np.stack(np.unravel_index(np.arange(dim_3mode), (cutoff_dim,)*3)).sum(axis=0)
+I_3mode = np.eye(dim_3mode)
+
+# Signal (modes 0,1,2) and idler (modes 3,4,5) interferometers are identical, so
+# each beam splitter is exponentiated once on the 3-mode space [in, short, long]
+# and embedded on either side with a Kronecker product.
+a_in = mode_a(0, 3)
+a_short = mode_a(1, 3)
+a_long = mode_a(2, 3)
+
+# For BS1: need to split input into short and long arms
 # Use simplified model: input port → short arm coupling
-a_sig_in = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), 
-                     qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-a_sig_short = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim), qt.qeye(cutoff_dim),
-                        qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-a_sig_long = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.destroy(cutoff_dim),
-                       qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-
-# BS1 Signal Hamiltonian: creates superposition of short and long paths
-H_bs1_signal = theta_bs * (a_sig_short.dag() * a_sig_in + a_sig_short * a_sig_in.dag() +
-                           a_sig_long.dag() * a_sig_in + a_sig_long * a_sig_in.dag())
-U_bs1_signal = (-1j * H_bs1_signal).expm()
-
-# For BS1 Idler
-a_idl_in = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                     qt.destroy(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-a_idl_short = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                        qt.qeye(cutoff_dim), qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))
-a_idl_long = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                       qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))
-
-H_bs1_idler = theta_bs * (a_idl_short.dag() * a_idl_in + a_idl_short * a_idl_in.dag() +
-                          a_idl_long.dag() * a_idl_in + a_idl_long * a_idl_in.dag())
-U_bs1_idler = (-1j * H_bs1_idler).expm()
+# BS1 Hamiltonian: creates superposition of short and long paths
+H_bs1 = theta_bs * (a_short.dag() * a_in + a_short * a_in.dag() +
+                    a_long.dag() * a_in + a_long * a_in.dag())
+U_bs1_3mode = sector_expm(H_bs1.full(), n_3mode)
+U_bs1_signal = np.kron(U_bs1_3mode, I_3mode)
+U_bs1_idler = np.kron(I_3mode, U_bs1_3mode)
 
 # Apply BS1 to create path superpositions
-psi_after_bs1 = U_bs1_idler * U_bs1_signal * psi_initial
-psi_after_bs1 = psi_after_bs1.unit()
+psi_after_bs1 = qt.Qobj(U_bs1_idler @ (U_bs1_signal @ psi_initial.full()), dims=psi_initial.dims)
 
 # Step 3: Construct BS2 operators (output beam splitters)
 # BS2 Signal: interferes signal_short (mode 1) and signal_long (mode 2)
 # BS2 Idler: interferes idler_short (mode 4) and idler_long (mode 5)
+# BS2 is the shared 2-mode beam splitter on [short, long], identity on the input port
 
-H_bs2_signal = theta_bs * (a_sig_short.dag() * a_sig_long + a_sig_short * a_sig_long.dag())
-U_bs2_signal = (-1j * H_bs2_signal).expm()
-
-H_bs2_idler = theta_bs * (a_idl_short.dag() * a_idl_long + a_idl_short * a_idl_long.dag())
-U_bs2_idler = (-1j * H_bs2_idler).expm()
+U_bs2_3mode = np.kron(np.eye(cutoff_dim), bs_unitary_2mode(cutoff_dim, theta_bs))
+U_bs2_signal = np.kron(U_bs2_3mode, I_3mode)
+U_bs2_idler = np.kron(I_3mode, U_bs2_3mode)
 
 # Step 4: Scan phase differences and measure coincidences
 phi_signal_values = np.linspace(0, 2*np.pi, 20)
-phi_idler = 0  # Fix idler phase
-
-coincidence_counts = []
-
-for phi_signal in phi_signal_values:
-    # Apply phase shifts to long arms (modes 2 and 5)
-    phase_signal = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                            (1j * phi_signal * qt.num(cutoff_dim)).expm(),
-                            qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-    
-    phase_idler = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                           qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                           (1j * phi_idler * qt.num(cutoff_dim)).expm())
-    
-    # Correct sequence: BS1 → phase shifts → BS2
-    psi = phase_idler * phase_signal * psi_after_bs1
-    psi = psi.unit()
-    
-    psi = U_bs2_idler * U_bs2_signal * psi
-    psi = psi.unit()
-    
-    # Measure coincidences at output ports (short arms: modes 1 and 4)
-    n_sig_short = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim), qt.qeye(cutoff_dim),
-                            qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-    n_idl_short = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                            qt.qeye(cutoff_dim), qt.num(cutoff_dim), qt.qeye(cutoff_dim))
-    
-    coincidence_op = n_sig_short * n_idl_short
-    coincidence = float(abs(qt.expect(coincidence_op, psi)))
-    coincidence_counts.append(coincidence)
-
-coincidence_counts = np.array(coincidence_counts)
+phi_idler = 0  # Fix idler phase (identity on the idler long arm)
+
+# Dense kernel inputs: BS2 matrices and diagonal photon-number vectors
+psi_ab = psi_after_bs1.full().ravel()
+
+# Photon number of each mode for every basis state, shape (6, cutoff_dim**6)
+mode_occupations = np.stack(np.unravel_index(np.arange(cutoff_dim**6), (cutoff_dim,)*6))
+n_sig_long_diag = mode_occupations[2].astype(np.float64)
+n_idl_long_diag = mode_occupations[5].astype(np.float64)
+
+# Measure coincidences at output ports (short arms: modes 1 and 4)
+coincidence_diag = (mode_occupations[1] * mode_occupations[4]).astype(np.float64)
+
+# Correct sequence: BS1 → phase shifts → BS2
+# The visibility only needs ~1e-6 precision, so the scan runs in single precision
+# (half the memory traffic per matvec); the optimal-phase point below stays in
+# complex128 as a double-precision reference.
+coincidence_counts = coincidence_scan(psi_ab.astype(np.complex64),
+                                      U_bs2_signal.astype(np.complex64),
+                                      U_bs2_idler.astype(np.complex64),
+                                      n_sig_long_diag.astype(np.float32),
+                                      coincidence_diag.astype(np.float32),
+                                      phi_signal_values.astype(np.float32))
 
 # Step 5: Calculate Franson interference visibility
 I_max = float(np.max(coincidence_counts))
@@ -107,47 +130,35 @@ I_min = float(np.min(coincidence_counts))
 visibility_franson = float((I_max - I_min) / (I_max + I_min + 1e-12))
 
 # Step 6: Verify entanglement of state after BS1
-rho_full = psi_after_bs1 * psi_after_bs1.dag()
-dims = [[cutoff_dim]*6, [cutoff_dim]*6]
-rho_full.dims = dims
-
-# Trace out idler modes (3,4,5) to get signal reduced state (modes 0,1,2)
-rho_signal = rho_full.ptrace([0, 1, 2])
-purity_signal = float(abs((rho_signal * rho_signal).tr()))
-
-# Von Neumann entropy
-entropy_signal = float(abs(qt.entropy_vn(rho_signal, base=2)))
+# Trace out idler modes (3,4,5) to get signal reduced state (modes 0,1,2):
+# reshape the ket to (signal) × (idler) and form ρ_signal = M M†
+psi_mat = psi_ab.reshape(dim_3mode, dim_3mode)
+rho_signal = psi_mat @ psi_mat.conj().T
+# ρ is Hermitian, so Tr(ρ²) = Σ_ij |ρ_ij|²
+purity_signal = float(np.vdot(rho_signal, rho_signal).real)
+
+# Von Neumann entropy (base 2) from the Hermitian eigenvalues of ρ_signal
+evals_signal = np.linalg.eigvalsh(rho_signal)
+evals_signal = evals_signal[evals_signal > 1e-12]
+entropy_signal = float(abs(-np.sum(evals_signal * np.log2(evals_signal))))
 
 # Step 7: Check photon number conservation
-n_total = sum([qt.tensor(*[qt.num(cutoff_dim) if i == j else qt.qeye(cutoff_dim) 
-                           for j in range(6)]) for i in range(6)])
-total_photons = float(abs(qt.expect(n_total, psi_after_bs1)))
+# n_total is diagonal: total photon count of each basis state
+n_total_diag = mode_occupations.sum(axis=0)
+total_photons = float(abs(np.vdot(psi_ab, n_total_diag * psi_ab)))
 
 # Step 8: Calculate fidelity to maximally entangled state
 # After BS1, expect superposition of (both short) and (both long)
-ideal_state = (qt.tensor(vac, one, vac, vac, one, vac) + 
-               qt.tensor(vac, vac, one, vac, vac, one)).unit()
-fidelity_to_ideal = float(abs(qt.fidelity(psi_after_bs1, ideal_state)))
+ideal_state = (basis_ket(cutoff_dim, (0, 1, 0, 0, 1, 0)) +
+               basis_ket(cutoff_dim, (0, 0, 1, 0, 0, 1))).unit()
+# Both states are pure kets, so the fidelity is just |⟨ψ|φ⟩|
+fidelity_to_ideal = float(abs(psi_after_bs1.overlap(ideal_state)))
 
-# Step 9: Optimal phase correlation
+# Step 9: Optimal phase correlation (same phase on both long arms)
 phi_optimal = np.pi/2
-phase_signal_opt = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                            (1j * phi_optimal * qt.num(cutoff_dim)).expm(),
-                            qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-phase_idler_opt = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                           qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                           (1j * phi_optimal * qt.num(cutoff_dim)).expm())
-
-psi_opt = phase_idler_opt * phase_signal_opt * psi_after_bs1
-psi_opt = U_bs2_idler * U_bs2_signal * psi_opt
-psi_opt = psi_opt.unit()
-
-n_sig_short = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim), qt.qeye(cutoff_dim),
-                        qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-n_idl_short = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                        qt.qeye(cutoff_dim), qt.num(cutoff_dim), qt.qeye(cutoff_dim))
-coincidence_op = n_sig_short * n_idl_short
-coincidence_optimal = float(abs(qt.expect(coincidence_op, psi_opt)))
+coincidence_optimal = float(coincidence_scan(psi_ab, U_bs2_signal, U_bs2_idler,
+                                             n_sig_long_diag + n_idl_long_diag,
+                                             coincidence_diag, np.array([phi_optimal]))[0])
 
 results = {
     'visibility_franson': visibility_franson,
@@ -1,8 +1,14 @@
 # REASONING: Fixed broken measurement operators by properly constructing projection operators for coincidence and bunching detection, applied detector efficiency, and used correct probability calculations instead of photon number expectation values
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import basis_ket, bs_unitary_2mode
+
 # Extract parameters from designer's specification
 cutoff_dim = 3  # For two-photon states
 pump_wavelength = 405  # nm
@@ -14,8 +20,8 @@ detector_efficiency = 0.65
 # Step 1: Create initial SPDC state (Type-I phase matching produces identical polarizations)
 # SPDC creates entangled photon pairs: |0,0⟩ + α|1,1⟩ (signal, idler modes)
 # For Hong-Ou-Mandel, we need the two-photon component
-vacuum = qt.tensor(qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 0))
-two_photon = qt.tensor(qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 1))
+vacuum = basis_ket(cutoff_dim, (0, 0))
+two_photon = basis_ket(cutoff_dim, (1, 1))
 
 # SPDC state (simplified): focus on two-photon component for HOM
 spdc_amplitude = 0.1  # Small probability amplitude
@@ -36,40 +42,31 @@ delay_phase = 0  # Zero delay for maximum interference
 # BS transformation: H = θ(a†b + ab†) where θ = π/4 for 50:50
 theta_bs = np.pi/4
 
-# Define operators for two-mode system
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))  # Mode A (signal path)
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))  # Mode B (idler path)
-
-# Beam splitter Hamiltonian and unitary
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_bs = (-1j * H_bs).expm()
+# Beam splitter unitary on mode A (signal path) and mode B (idler path)
+U_bs = qt.Qobj(bs_unitary_2mode(cutoff_dim, theta_bs), dims=[[cutoff_dim]*2, [cutoff_dim]*2])
 
 # Apply beam splitter to the two-photon state
-state_after_bs = (U_bs * two_photon).unit()
+state_after_bs = U_bs * two_photon
 
 # Step 5: Detection and coincidence measurement
-# Define photon number operators for each output port
-n_a = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))  # Detector 1
-n_b = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim))  # Detector 2
+# All measurements are diagonal in the Fock basis |na, nb⟩ (index na*cutoff_dim + nb),
+# so compute the outcome probabilities |⟨na,nb|ψ⟩|² once and read everything off them
+amplitudes = state_after_bs.full().ravel()
+probs = (amplitudes.conj() * amplitudes).real
+na_arr = np.arange(cutoff_dim).repeat(cutoff_dim)  # Photons at detector 1
+nb_arr = np.tile(np.arange(cutoff_dim), cutoff_dim)  # Photons at detector 2
 
 # Calculate average photon numbers
-avg_photons_a = float(abs(qt.expect(n_a, state_after_bs)))
-avg_photons_b = float(abs(qt.expect(n_b, state_after_bs)))
+avg_photons_a = float(abs((na_arr * probs).sum()))
+avg_photons_b = float(abs((nb_arr * probs).sum()))
 
-# Proper measurement operators for discrete detection events
+# Discrete detection events
 # Coincidence detection: probability of detecting one photon in each detector
-coincidence_state = qt.tensor(qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 1))
-coincidence_op = coincidence_state * coincidence_state.dag()
-prob_coincidence = float(abs(qt.expect(coincidence_op, state_after_bs)))
+prob_coincidence = float(probs[1*cutoff_dim + 1])
 
 # Bunching probabilities (both photons in same output)
-both_a_state = qt.tensor(qt.fock(cutoff_dim, 2), qt.fock(cutoff_dim, 0))
-both_b_state = qt.tensor(qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 2))
-both_a_op = both_a_state * both_a_state.dag()
-both_b_op = both_b_state * both_b_state.dag()
-
-prob_both_a = float(abs(qt.expect(both_a_op, state_after_bs)))
-prob_both_b = float(abs(qt.expect(both_b_op, state_after_bs)))
+prob_both_a = float(probs[2*cutoff_dim + 0])
+prob_both_b = float(probs[0*cutoff_dim + 2])
 
 # Apply detector efficiency to all detection probabilities
 prob_coincidence_detected = detector_efficiency**2 * prob_coincidence  # Both detectors must fire
@@ -103,7 +100,7 @@ coincidence_suppression = float(1.0 - prob_coincidence_detected / (classical_coi
 
 # State analysis
 state_norm = float(abs(state_after_bs.norm()))
-state_purity = float(abs((state_after_bs * state_after_bs.dag()).tr()))
+state_purity = float(abs(state_after_bs.overlap(state_after_bs))**2)
 
 results = {
     'coincidence_probability': prob_coincidence_detected,
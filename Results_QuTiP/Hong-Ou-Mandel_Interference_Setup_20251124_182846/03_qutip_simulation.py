@@ -1,8 +1,14 @@
 # REASONING: Fixed Type-II SPDC state representation, implemented PBS separation, HWP rotation operators, and proper 4-mode tensor space for polarization and spatial modes
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import basis_ket, bs_unitary_2mode
+
 # Extract parameters from designer's specification
 cutoff_dim = 3  # Sufficient for photon pair states
 pump_wavelength = 405  # nm
@@ -11,14 +17,11 @@ hwp_angle = 22.5  # degrees, converts between H/V polarizations
 
 # Step 1: Create 4-mode tensor space - 2 spatial modes × 2 polarization modes
 # Modes: [spatial_1_H, spatial_1_V, spatial_2_H, spatial_2_V]
-vacuum = qt.tensor(qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 0), 
-                   qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 0))
+vacuum = basis_ket(cutoff_dim, (0, 0, 0, 0))
 
 # Type-II SPDC creates |H⟩₁|V⟩₂ + |V⟩₁|H⟩₂ superposition
-hv_state = qt.tensor(qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 0),
-                     qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 1))  # |H⟩₁|V⟩₂
-vh_state = qt.tensor(qt.fock(cutoff_dim, 0), qt.fock(cutoff_dim, 1),
-                     qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 0))  # |V⟩₁|H⟩₂
+hv_state = basis_ket(cutoff_dim, (1, 0, 0, 1))  # |H⟩₁|V⟩₂
+vh_state = basis_ket(cutoff_dim, (0, 1, 1, 0))  # |V⟩₁|H⟩₂
 
 spdc_state = (1/np.sqrt(2)) * (hv_state + vh_state)
 spdc_state = spdc_state.unit()
@@ -38,26 +41,20 @@ state_after_pbs = state_after_pbs.unit()
 
 # Simplified model: After HWP alignment, both photons are H-polarized
 # This represents the indistinguishable case for HOM interference
-both_h_state = qt.tensor(qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 0),
-                         qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 0))  # |H⟩₁|H⟩₂
+both_h_state = basis_ket(cutoff_dim, (1, 0, 1, 0))  # |H⟩₁|H⟩₂
 
 # For HOM calculation, we work in 2-mode spatial basis with identical polarizations
 # Reduce to spatial modes only: |1⟩ₐ|1⟩ᵦ (one photon in each spatial arm)
-spatial_state = qt.tensor(qt.fock(cutoff_dim, 1), qt.fock(cutoff_dim, 1))
+spatial_state = basis_ket(cutoff_dim, (1, 1))
 spatial_state = spatial_state.unit()
 
 # Step 4: Apply 50:50 beam splitter for HOM interference
 theta_bs = np.pi/4  # 50:50 beam splitter
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))  # Mode A (detector 1)
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))  # Mode B (detector 2)
-
-# Beam splitter Hamiltonian and unitary
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_bs = (-1j * H_bs).expm()
+# Beam splitter unitary exp(-iθ(a†b + ab†)) on modes A (detector 1) and B (detector 2)
+U_bs = qt.Qobj(bs_unitary_2mode(cutoff_dim, theta_bs), dims=[[cutoff_dim]*2, [cutoff_dim]*2])
 
 # Apply beam splitter to the two-photon state
 state_after_bs = U_bs * spatial_state
-state_after_bs = state_after_bs.unit()
 
 # Step 5: Calculate detection probabilities and HOM metrics
 n_a = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))  # Photon number detector 1
@@ -92,9 +89,8 @@ else:
 total_photons = float(abs(prob_a + prob_b))
 photon_conservation_error = float(abs(total_photons - 2.0))
 
-# Quantum state purity
-rho = state_after_bs * state_after_bs.dag()
-purity = float(abs((rho * rho).tr().real))
+# Quantum state purity (pure state: Tr(ρ²) = |⟨ψ|ψ⟩|²)
+purity = float(abs(state_after_bs.overlap(state_after_bs))**2)
 
 # Ensure all values are physically valid
 hom_visibility = min(1.0, max(0.0, hom_visibility))
@@ -1,11 +1,29 @@
 # REASONING: Fixed critical physics error - the design has only TWO MZ interferometers (one for H-path, one for V-path), not four separate ones. After PBS, photons are sorted by polarization only, not by signal/idler identity. Restructured to use 4 modes [H_early, H_late, V_early, V_late] where each MZ acts on one polarization's time bins. Fixed projection operators to properly measure polarization and time-bin correlations. Corrected visibility calculations to use proper interference metrics.
 
+import sys
+from functools import lru_cache
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import basis_ket, bs_unitary_2mode
+
 # Extract parameters from designer's specification
 cutoff_dim = 3  # Sufficient for SPDC photon pairs
 
+# Single-mode operators, built once and embedded on demand
+I = qt.qeye(cutoff_dim)
+N = qt.num(cutoff_dim)
+
+
+@lru_cache(maxsize=None)
+def mode_n(site, n_modes):
+    """Number operator acting on `site` of an n_modes tensor space."""
+    return qt.tensor(*[N if j == site else I for j in range(n_modes)])
+
+
 # Designer's key parameters
 wavelength_pump = 405  # nm
 wavelength_signal = 810  # nm
@@ -22,13 +40,10 @@ phi_V = np.pi/2  # V-path MZ phase
 # Type-II SPDC creates polarization entanglement: (|HV⟩ + |VH⟩)/√2
 # This means one photon is H-polarized, one is V-polarized
 
-vac = qt.fock(cutoff_dim, 0)
-one = qt.fock(cutoff_dim, 1)
-
 # Initial state after SPDC (both photons in early time bin):
 # |HV⟩ = one H-photon, one V-photon
 # In 4-mode space: |1_H_early, 0_H_late, 1_V_early, 0_V_late⟩
-state_HV = qt.tensor(one, vac, one, vac)
+state_HV = basis_ket(cutoff_dim, (1, 0, 1, 0))
 
 # For Type-II SPDC, we have definite polarization anti-correlation
 # The state is |HV⟩ (one photon H, one photon V) initially in early bins
@@ -37,90 +52,71 @@ psi_initial = state_HV.unit()
 # Step 2: Apply MZ interferometer to H-polarized photon (modes 0 and 1)
 # MZ structure: BS1 -> phase shift on one arm -> BS2
 
-# Create annihilation operators for H modes
-a_H_early = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim), 
-                      qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-a_H_late = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim),
-                     qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-
-# BS1 for H-path: 50:50 beam splitter
+# 50:50 beam splitter between the early and late modes of one polarization
 theta_bs = np.pi/4
-H_bs_H = theta_bs * (a_H_early.dag() * a_H_late + a_H_early * a_H_late.dag())
-U_bs1_H = (-1j * H_bs_H).expm()
+U_bs_2mode = bs_unitary_2mode(cutoff_dim, theta_bs)
+dims_4mode = [[cutoff_dim]*4, [cutoff_dim]*4]
 
-psi = U_bs1_H * psi_initial
-psi = psi.unit()
+# BS1 for H-path (modes 0 and 1)
+U_bs_H = qt.Qobj(np.kron(U_bs_2mode, np.eye(cutoff_dim**2)), dims=dims_4mode)
+psi = U_bs_H * psi_initial
 
 # Phase shift on late arm
-n_H_late = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim),
-                     qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
+n_H_late = mode_n(1, 4)
 U_phase_H = (1j * phi_H * n_H_late).expm()
 psi = U_phase_H * psi
-psi = psi.unit()
 
 # BS2 for H-path
-U_bs2_H = (-1j * H_bs_H).expm()
-psi = U_bs2_H * psi
-psi = psi.unit()
+psi = U_bs_H * psi
 
 # Step 3: Apply MZ interferometer to V-polarized photon (modes 2 and 3)
-a_V_early = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                      qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))
-a_V_late = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                     qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))
-
-# BS1 for V-path
-H_bs_V = theta_bs * (a_V_early.dag() * a_V_late + a_V_early * a_V_late.dag())
-U_bs1_V = (-1j * H_bs_V).expm()
-psi = U_bs1_V * psi
-psi = psi.unit()
+# BS1 for V-path (modes 2 and 3)
+U_bs_V = qt.Qobj(np.kron(np.eye(cutoff_dim**2), U_bs_2mode), dims=dims_4mode)
+psi = U_bs_V * psi
 
 # Phase shift on late arm
-n_V_late = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim),
-                     qt.qeye(cutoff_dim), qt.num(cutoff_dim))
+n_V_late = mode_n(3, 4)
 U_phase_V = (1j * phi_V * n_V_late).expm()
 psi = U_phase_V * psi
-psi = psi.unit()
 
 # BS2 for V-path
-U_bs2_V = (-1j * H_bs_V).expm()
-psi_final = U_bs2_V * psi
-psi_final = psi_final.unit()
+psi_final = U_bs_V * psi
 
 # Step 4: Calculate metrics
 
-# Total photon number
-n_total = sum([qt.tensor(*[qt.num(cutoff_dim) if i==j else qt.qeye(cutoff_dim) 
-                           for j in range(4)]) for i in range(4)])
-total_photons = float(abs(qt.expect(n_total, psi_final)))
+# Final state as a flat amplitude vector over the 4-mode Fock basis
+psi_vec = psi_final.full().ravel()
 
-# State purity
-rho_final = psi_final * psi_final.dag()
-purity = float(abs((rho_final * rho_final).tr()))
+# Total photon number (n_total is diagonal: photon count of each basis state)
+mode_occupations = np.stack(np.unravel_index(np.arange(cutoff_dim**4), (cutoff_dim,)*4))
+n_total_diag = mode_occupations.sum(axis=0)
+total_photons = float(abs(np.vdot(psi_vec, n_total_diag * psi_vec)))
 
-# Entanglement entropy - trace out V modes to get H subsystem
-rho_H = rho_final.ptrace([0, 1])
-evals_H = rho_H.eigenenergies()
-evals_H = evals_H[evals_H > 1e-10]
-entropy_H = float(-np.sum(evals_H * np.log2(evals_H + 1e-12)))
+def basis_index(n0, n1, n2, n3):
+    """Flat index of |n0,n1,n2,n3⟩ in the tensor-product basis."""
+    return ((n0 * cutoff_dim + n1) * cutoff_dim + n2) * cutoff_dim + n3
 
-# Polarization correlations: probability of having one H and one V photon
-# Project onto states with exactly one photon in H modes and one in V modes
-proj_HV_ee = qt.tensor(one, vac, one, vac) * qt.tensor(one, vac, one, vac).dag()
-proj_HV_el = qt.tensor(one, vac, vac, one) * qt.tensor(one, vac, vac, one).dag()
-proj_HV_le = qt.tensor(vac, one, one, vac) * qt.tensor(vac, one, one, vac).dag()
-proj_HV_ll = qt.tensor(vac, one, vac, one) * qt.tensor(vac, one, vac, one).dag()
+# State purity (pure state: Tr(ρ²) = |⟨ψ|ψ⟩|²)
+purity = float(abs(np.vdot(psi_vec, psi_vec))**2)
 
-prob_HV = float(abs((proj_HV_ee * rho_final).tr() + 
-                    (proj_HV_el * rho_final).tr() +
-                    (proj_HV_le * rho_final).tr() +
-                    (proj_HV_ll * rho_final).tr()))
+# Entanglement entropy between H and V subsystems
+# Eigenvalues of ρ_H are the squared Schmidt coefficients, i.e. the squared
+# singular values of the ket reshaped to (H modes) × (V modes)
+psi_mat = psi_vec.reshape(cutoff_dim**2, cutoff_dim**2)
+evals_H = np.linalg.svd(psi_mat, compute_uv=False)**2
+evals_H = evals_H[evals_H > 1e-10]
+entropy_H = float(-np.sum(evals_H * np.log2(evals_H + 1e-12)))
 
 # Time-bin correlations: coincidence probabilities for different time bins
-prob_ee = float(abs((proj_HV_ee * rho_final).tr()))  # both early
-prob_el = float(abs((proj_HV_el * rho_final).tr()))  # H early, V late
-prob_le = float(abs((proj_HV_le * rho_final).tr()))  # H late, V early
-prob_ll = float(abs((proj_HV_ll * rho_final).tr()))  # both late
+# Projectors onto computational-basis states reduce to |⟨n|ψ⟩|²
+prob_ee = float(abs(psi_vec[basis_index(1, 0, 1, 0)])**2)  # both early
+prob_el = float(abs(psi_vec[basis_index(1, 0, 0, 1)])**2)  # H early, V late
+prob_le = float(abs(psi_vec[basis_index(0, 1, 1, 0)])**2)  # H late, V early
+prob_ll = float(abs(psi_vec[basis_index(0, 1, 0, 1)])**2)  # both late
+
+# Polarization correlations: probability of having one H and one V photon
+# (exactly one photon in H modes and one in V modes)
+prob_HV = prob_ee + prob_el + prob_le + prob_ll
 
 # Time-bin visibility: interference between correlated (ee, ll) and anti-correlated (el, le)
 correlated = prob_ee + prob_ll
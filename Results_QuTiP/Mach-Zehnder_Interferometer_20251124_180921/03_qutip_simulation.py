@@ -1,10 +1,18 @@
 # REASONING: Fixed critical issues - added missing data collection in phase loop, corrected theoretical visibility formula for coherent states, completed energy conservation check, and ensured all results are properly stored
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import beam_splitter_sweep, bs_unitary_2mode, coherent_ket, port_photon_numbers
+
 # Extract parameters from designer's specification
 cutoff_dim = 5  # Adequate for coherent state simulation
+# Not lowered: required_cutoff(alpha=2.0) from qutip_ops_cache is 23 for a 1e-10 tail, so any
+# smaller cutoff only adds truncation error relative to the recorded results
 wavelength = 632.8  # nm (He-Ne laser)
 power = 5  # mW
 transmittance = 0.5  # 50:50 beam splitters
@@ -17,47 +25,31 @@ alpha = 2.0  # Coherent state parameter
 
 # Step 1: Create initial coherent laser state in two-mode system
 # Mode 0: input beam, Mode 1: initially vacuum (for beam splitter operation)
-coherent_state = qt.coherent(cutoff_dim, alpha)
+coherent_state = coherent_ket(cutoff_dim, alpha)
 vacuum_state = qt.fock(cutoff_dim, 0)
 initial_state = qt.tensor(coherent_state, vacuum_state)
 initial_state = initial_state.unit()
 
 # Step 2: First beam splitter (Input BS) - 50:50 splitting
 theta_bs = np.pi/4  # 50:50 beam splitter angle
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))  # Mode 0 annihilation
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))  # Mode 1 annihilation
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_bs1 = (-1j * H_bs).expm()
+# exp(-iθ(a†b + ab†)) with a, b the mode 0 and mode 1 annihilation operators
+bs_dims = [[cutoff_dim]*2, [cutoff_dim]*2]
+U_bs1 = qt.Qobj(bs_unitary_2mode(cutoff_dim, theta_bs), dims=bs_dims)
 state_after_bs1 = U_bs1 * initial_state
-state_after_bs1 = state_after_bs1.unit()
 
 # Step 3: Apply phase shifter to upper path (mode 1)
 # Test multiple phases to calculate visibility
 phases = [0, np.pi/2, np.pi, 3*np.pi/2]
-detector1_outputs = []
-detector2_outputs = []
-
-for phi in phases:
-    # Phase shift on mode 1 (upper path)
-    phase_op = qt.tensor(qt.qeye(cutoff_dim), (1j * phi * qt.num(cutoff_dim)).expm())
-    state_with_phase = phase_op * state_after_bs1
-    state_with_phase = state_with_phase.unit()
-    
-    # Step 4: Second beam splitter (Output BS) - recombination
-    U_bs2 = (-1j * H_bs).expm()
-    final_state = U_bs2 * state_with_phase
-    final_state = final_state.unit()
-    
-    # Step 5: Measure photon numbers at detectors
-    n_mode0 = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))  # Detector 1
-    n_mode1 = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim))  # Detector 2
-    
-    output1 = float(abs(qt.expect(n_mode0, final_state))) * detector_efficiency
-    output2 = float(abs(qt.expect(n_mode1, final_state))) * detector_efficiency
-    
-    # FIXED: Actually store the calculated outputs
-    detector1_outputs.append(output1)
-    detector2_outputs.append(output2)
+
+# Step 4: Second beam splitter (Output BS) - recombination, for all phases at once
+final_states = beam_splitter_sweep(cutoff_dim, state_after_bs1, phases, theta_bs, phase_mode=1)
+
+# Step 5: Measure photon numbers at detectors (mode 0: detector 1, mode 1: detector 2)
+detector_photons = port_photon_numbers(cutoff_dim, final_states) * detector_efficiency
+
+# FIXED: Actually store the calculated outputs
+detector1_outputs = [float(v) for v in detector_photons[0]]
+detector2_outputs = [float(v) for v in detector_photons[1]]
 
 # Calculate visibility for interference verification
 I_max_det1 = max(detector1_outputs)
@@ -77,8 +69,8 @@ total_energy_final = detector1_outputs[0] + detector2_outputs[0]  # At phase = 0
 theoretical_visibility = 1.0
 
 # Verify superposition by checking state purity after first beam splitter
-rho_after_bs1 = state_after_bs1 * state_after_bs1.dag()
-purity = float(abs((rho_after_bs1 * rho_after_bs1).tr()))
+# (pure state: Tr(ρ²) = |⟨ψ|ψ⟩|²)
+purity = float(abs(state_after_bs1.overlap(state_after_bs1))**2)
 
 # Store results
 results = {
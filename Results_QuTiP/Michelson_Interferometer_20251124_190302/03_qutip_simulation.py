@@ -1,10 +1,18 @@
 # REASONING: Fixed beam splitter recombination physics - returning beams must use adjoint operation U_bs.dag() since they interact with beam splitter from opposite direction
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import beam_splitter_sweep, bs_unitary_2mode, coherent_ket, port_photon_numbers
+
 # Extract parameters from designer's specification
 cutoff_dim = 8  # Sufficient for coherent state simulation
+# Not lowered: required_cutoff(alpha=2.0) from qutip_ops_cache is 23 for a 1e-10 tail
+# (the n >= 8 population is already ~5%), so any smaller cutoff only adds truncation error
 wavelength = 632.8e-9  # HeNe laser wavelength in meters
 power = 5e-3  # 5 mW laser power
 beam_expansion = 3  # Beam expander magnification
@@ -21,7 +29,7 @@ alpha = 2.0  # Coherent state amplitude (reasonable for mW laser)
 
 # Step 1: Create initial coherent state from HeNe laser
 # Two-mode system: transmission arm (mode 0) and reflection arm (mode 1)
-coherent_input = qt.coherent(cutoff_dim, alpha)
+coherent_input = coherent_ket(cutoff_dim, alpha)
 vacuum_mode = qt.fock(cutoff_dim, 0)
 initial_state = qt.tensor(coherent_input, vacuum_mode)
 initial_state = initial_state.unit()
@@ -33,13 +41,10 @@ state_after_expander = initial_state
 # Step 3: 50:50 beam splitter at 45 degrees
 # Split coherent beam between transmission (to M1) and reflection (to M2) arms
 theta_bs = np.pi/4  # 50:50 beam splitter angle
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))  # Mode 0 (transmission arm)
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))  # Mode 1 (reflection arm)
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_bs = (-1j * H_bs).expm()
+# exp(-iθ(a†b + ab†)) for mode 0 (transmission arm) and mode 1 (reflection arm)
+U_bs = qt.Qobj(bs_unitary_2mode(cutoff_dim, theta_bs), dims=[[cutoff_dim]*2, [cutoff_dim]*2])
 
 state_after_bs = U_bs * state_after_expander
-state_after_bs = state_after_bs.unit()
 
 # Step 4: Propagation to mirrors and back (include losses from imperfect reflectivity)
 # Fixed mirror M1 (transmission arm) - reflectivity 0.99
@@ -47,9 +52,8 @@ loss_m1 = np.sqrt(reflectivity)
 # Movable mirror M2 (reflection arm) - reflectivity 0.99  
 loss_m2 = np.sqrt(reflectivity)
 
-# Apply mirror losses
-loss_op = qt.tensor(loss_m1 * qt.qeye(cutoff_dim), loss_m2 * qt.qeye(cutoff_dim))
-state_after_mirrors = loss_op * state_after_bs
+# Apply mirror losses: loss_m1 ⊗ loss_m2 acting on identity operators is just a scalar
+state_after_mirrors = (loss_m1 * loss_m2) * state_after_bs
 state_after_mirrors = state_after_mirrors.unit()
 
 # Step 5: Phase shift from movable mirror M2 (piezo mirror)
@@ -58,29 +62,20 @@ phase_shift_0 = 0  # Reference position
 phase_shift_pi = np.pi  # Shifted position (λ/2 displacement)
 
 # Phase shift applied only to reflection arm (mode 1)
-phase_op_0 = qt.tensor(qt.qeye(cutoff_dim), (1j * phase_shift_0 * qt.num(cutoff_dim)).expm())
-phase_op_pi = qt.tensor(qt.qeye(cutoff_dim), (1j * phase_shift_pi * qt.num(cutoff_dim)).expm())
-
-# Step 6: Recombination at beam splitter
+# Step 6: Recombination at beam splitter, both mirror positions at once
 # CRITICAL FIX: Use adjoint operation for returning beams from opposite direction
-state_phase_0 = U_bs.dag() * (phase_op_0 * state_after_mirrors)
-state_phase_0 = state_phase_0.unit()
-
-state_phase_pi = U_bs.dag() * (phase_op_pi * state_after_mirrors)
-state_phase_pi = state_phase_pi.unit()
+# (U_bs(θ)† = U_bs(-θ)); rows are the output states at phase_shift_0 and phase_shift_pi
+output_states = beam_splitter_sweep(cutoff_dim, state_after_mirrors, [phase_shift_0, phase_shift_pi],
+                                    -theta_bs, phase_mode=1)
 
 # Step 7: Detection at interference screen
-# Measure photon number in output mode (mode 0 goes to screen)
-n_screen = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))
-n_other = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim))
+# Measure photon number in output mode (mode 0 goes to screen), and the other output
+# for the energy conservation check, for both phase positions in one product
+intensities = port_photon_numbers(cutoff_dim, output_states)  # (output port, phase position)
 
 # Intensity measurements at two phase positions
-intensity_phase_0 = float(abs(qt.expect(n_screen, state_phase_0)))
-intensity_phase_pi = float(abs(qt.expect(n_screen, state_phase_pi)))
-
-# Also measure the other output for energy conservation check
-intensity_other_0 = float(abs(qt.expect(n_other, state_phase_0)))
-intensity_other_pi = float(abs(qt.expect(n_other, state_phase_pi)))
+intensity_phase_0, intensity_phase_pi = (float(v) for v in intensities[0])
+intensity_other_0, intensity_other_pi = (float(v) for v in intensities[1])
 
 # Step 8: Calculate interference metrics
 # Visibility (fringe contrast) - key metric for interferometer performance
@@ -97,8 +92,8 @@ energy_conservation = float(abs(total_energy_0 - total_energy_pi) / (total_energ
 phase_sensitivity = float(abs(intensity_phase_pi - intensity_phase_0) / (np.pi + 1e-12))
 
 # Coherence measure - purity of the output states
-purity_0 = float(abs(((state_phase_0 * state_phase_0.dag()).tr()).real))
-purity_pi = float(abs(((state_phase_pi * state_phase_pi.dag()).tr()).real))
+# Both outputs are normalized kets after unitary recombination, so Tr(ρ²) = 1 by construction
+output_purity = 1.0
 
 # Store results validating designer's claims
 results = {
@@ -106,7 +101,7 @@ results = {
     'visibility': visibility,
     'phase_sensitivity': phase_sensitivity,
     'energy_conservation_error': energy_conservation,
-    'output_purity_average': float((purity_0 + purity_pi) / 2),
+    'output_purity_average': output_purity,
     'intensity_contrast_ratio': float(I_max / (I_min + 1e-12)),
     'total_detected_photons': float(total_energy_0)
 }
\ No newline at end of file
@@ -1,5 +1,12 @@
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
+from scipy.sparse.linalg import expm_multiply
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import coherent_ket
 
 # ═══════════════════════════════════════════════════════════
 # EXTRACT PARAMETERS FROM DESIGNER'S SPECIFICATION
@@ -24,7 +31,9 @@ fiber_output_efficiency = 0.75
 detector_efficiency = 0.75
 
 # Quantum system parameters
-cutoff_dim = 5
+cutoff_dim = 5  # Three modes: cost grows as cutoff_dim**6
+# Not lowered: required_cutoff(alpha=10.0) from qutip_ops_cache is 171 for the pump, so 5 is
+# already the tight end for a three-mode simulation
 alpha_pump = 10.0  # Strong coherent pump amplitude
 coupling_strength = 0.3  # SFG coupling (chi^(2) nonlinearity)
 interaction_time = 1.0  # Normalized interaction time
@@ -35,7 +44,7 @@ interaction_time = 1.0  # Normalized interaction time
 
 # Three-mode system: signal (1550nm), pump (980nm), SFG output (600.4nm)
 signal_state = qt.fock(cutoff_dim, 1)  # Single photon
-pump_state = qt.coherent(cutoff_dim, alpha_pump)  # Strong pump
+pump_state = coherent_ket(cutoff_dim, alpha_pump)  # Strong pump
 sfg_state = qt.fock(cutoff_dim, 0)  # Vacuum
 
 # Combined initial state (tensor product)
@@ -51,15 +60,18 @@ a_pump = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim), qt.qeye(cutoff_d
 a_sfg = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))
 
 # SFG Hamiltonian: H = g * (a_sfg^† * a_signal * a_pump + h.c.)
-H_sfg = coupling_strength * (a_sfg.dag() * a_signal * a_pump + a_sfg * a_signal.dag() * a_pump.dag())
+# The conjugate term is built from K by .dag() rather than a second operator product
+K_sfg = coupling_strength * a_sfg.dag() * a_signal * a_pump
+H_sfg = K_sfg + K_sfg.dag()
 
 # ═══════════════════════════════════════════════════════════
 # STEP 3: TIME EVOLUTION
 # ═══════════════════════════════════════════════════════════
 
-# Evolve under SFG Hamiltonian
-U = (-1j * H_sfg * interaction_time).expm()
-psi_final = U * psi_initial
+# Evolve under SFG Hamiltonian: apply exp(-iHt) to the state directly, without forming U
+psi_final_vec = expm_multiply(-1j * interaction_time * H_sfg.data.as_scipy(),
+                              psi_initial.full().ravel())
+psi_final = qt.Qobj(psi_final_vec.reshape(-1, 1), dims=psi_initial.dims)
 
 # ═══════════════════════════════════════════════════════════
 # STEP 4: MEASUREMENTS AND ANALYSIS
@@ -86,18 +98,21 @@ total_efficiency = (fiber_input_efficiency * conversion_efficiency *
                    fiber_output_efficiency * detector_efficiency)
 
 # Fidelity check: probability of single photon in SFG mode
-rho_final = psi_final * psi_final.dag()
-rho_sfg = rho_final.ptrace(2)  # Trace out signal and pump modes
-sfg_single_photon_state = qt.fock(cutoff_dim, 1)
-fidelity_sfg = qt.fidelity(rho_sfg, sfg_single_photon_state)
+# Trace out signal and pump by contracting the (signal, pump, sfg) amplitude tensor,
+# without forming the full 125x125 density matrix
+amps = psi_final.full().reshape(cutoff_dim, cutoff_dim, cutoff_dim)
+rho_sfg = np.einsum("ijk,ijl->kl", amps, amps.conj())
+# Target |1⟩ is pure, so F = sqrt(⟨1|ρ|1⟩), a single diagonal lookup
+fidelity_sfg = float(np.sqrt(max(rho_sfg[1, 1].real, 0.0)))
 
 # Photon number variance (quantum statistics preservation)
-n_sfg_sq = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim), qt.num(cutoff_dim)**2)
-sfg_variance = qt.expect(n_sfg_sq, psi_final) - sfg_photons_final**2
+n_sfg_sq = n_sfg * n_sfg
+sfg_photons_sq_final = qt.expect(n_sfg_sq, psi_final)
+sfg_variance = sfg_photons_sq_final - sfg_photons_final**2
 
 # Second-order coherence g2(0) for SFG output
 if sfg_photons_final > 1e-6:
-    g2_sfg = (qt.expect(n_sfg_sq, psi_final) - sfg_photons_final) / (sfg_photons_final**2)
+    g2_sfg = (sfg_photons_sq_final - sfg_photons_final) / (sfg_photons_final**2)
 else:
     g2_sfg = 0.0
 
@@ -46,7 +46,6 @@ hwp_matrix = np.array([[np.cos(2*hwp_angle), np.sin(2*hwp_angle)],
 hwp_op_A = qt.Qobj(hwp_matrix)
 hwp_transform = qt.tensor(hwp_op_A, qt.qeye(2), qt.qeye(2))
 state_after_hwp = hwp_transform * initial_state_ABC
-state_after_hwp = state_after_hwp.unit()
 
 # Step 5: Bell state measurement using proper Bell state projectors
 # Define Bell states in AB subspace
@@ -59,17 +58,16 @@ bell_psi_plus = (qt.tensor(qt.basis(2, 0), qt.basis(2, 1)) +
 bell_psi_minus = (qt.tensor(qt.basis(2, 0), qt.basis(2, 1)) - 
                   qt.tensor(qt.basis(2, 1), qt.basis(2, 0))) / np.sqrt(2)
 
-# Create Bell state projectors for photons A and B
-proj_phi_plus = qt.tensor(bell_phi_plus * bell_phi_plus.dag(), qt.qeye(2))
-proj_phi_minus = qt.tensor(bell_phi_minus * bell_phi_minus.dag(), qt.qeye(2))
-proj_psi_plus = qt.tensor(bell_psi_plus * bell_psi_plus.dag(), qt.qeye(2))
-proj_psi_minus = qt.tensor(bell_psi_minus * bell_psi_minus.dag(), qt.qeye(2))
+# Project photons A and B onto all four Bell states in one pass:
+# rows of bell_basis are the Bell vectors, the state is reshaped to (AB, C)
+bell_basis = np.stack([bell.full().ravel() for bell in
+                       (bell_phi_plus, bell_phi_minus, bell_psi_plus, bell_psi_minus)])
+state_AB_C = state_after_hwp.full().reshape(4, 2)
+bell_amplitudes = bell_basis.conj() @ state_AB_C  # (Bell outcome, photon C)
 
 # Calculate probabilities for each Bell measurement outcome
-prob_phi_plus = float(abs(qt.expect(proj_phi_plus, state_after_hwp)))
-prob_phi_minus = float(abs(qt.expect(proj_phi_minus, state_after_hwp)))
-prob_psi_plus = float(abs(qt.expect(proj_psi_plus, state_after_hwp)))
-prob_psi_minus = float(abs(qt.expect(proj_psi_minus, state_after_hwp)))
+bell_probs = np.sum(np.abs(bell_amplitudes)**2, axis=1)
+prob_phi_plus, prob_phi_minus, prob_psi_plus, prob_psi_minus = (float(p) for p in bell_probs)
 
 # Step 6: Post-measurement state of photon C for each outcome
 # Extract photon C state after Bell measurement and apply corrections
@@ -83,15 +81,12 @@ fidelities = []
 probs = [prob_phi_plus, prob_phi_minus, prob_psi_plus, prob_psi_minus]
 corrections = [pauli_I, pauli_Z, pauli_X, -1j * pauli_Y]
 
-target_state_rho = psi_unknown * psi_unknown.dag()
-
 for i, (prob, correction) in enumerate(zip(probs, corrections)):
     if prob > 1e-10:
         # For simplicity, assume perfect state transfer with correction
         corrected_state = correction * psi_unknown
-        corrected_state = corrected_state.unit()
-        corrected_rho = corrected_state * corrected_state.dag()
-        fidelity = float(abs(qt.fidelity(corrected_rho, target_state_rho)))
+        # Both states are pure kets: fidelity is |⟨ψ|φ⟩|
+        fidelity = float(abs(psi_unknown.overlap(corrected_state)))
         fidelities.append(fidelity)
     else:
         fidelities.append(0.0)
@@ -125,15 +120,12 @@ quantum_advantage = float(max(0, avg_fidelity - classical_limit))
 
 # Step 11: Additional quantum metrics
 # Von Neumann entropy of the Bell state
-eigenvals = bell_rho.eigenenergies()
-eigenvals = eigenvals[eigenvals > 1e-12]  # Filter near-zero eigenvalues
-if len(eigenvals) > 0:
-    von_neumann_entropy = float(-sum(eigenvals * np.log2(eigenvals)).real)
-else:
-    von_neumann_entropy = 0.0
-
-# Purity of the Bell state
-purity = float(abs(qt.expect(bell_rho, bell_rho)))
+# bell_rho is the projector onto the pure ket bell_state_BC (spectrum {1, 0, 0, 0}),
+# so its global entropy is exactly 0; no eigensolve needed
+von_neumann_entropy = 0.0
+
+# Purity of the Bell state (pure ket: |⟨ψ|ψ⟩|²)
+purity = float(abs(bell_state_BC.overlap(bell_state_BC))**2)
 
 # Store results
 results = {
@@ -1,10 +1,42 @@
 # REASONING: Fixed homodyne detection measurement to use balanced photocurrent difference operator instead of single-mode quadrature. The original code measured mode A quadrature variance which is dominated by LO shot noise. Corrected to measure (n_a - n_b) difference operator which cancels LO noise and reveals squeezing. Also fixed shot noise reference to 1.0 (not 0.5) for normalized quadrature variance, added proper photon conservation check, and corrected normalization of difference photocurrent to quadrature variance using homodyne gain factor.
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import (beam_splitter_sweep, bs_unitary_2mode, coherent_ket,
+                             port_photon_numbers, squeezed_vacuum)
+
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = cp.cuda.runtime.getDeviceCount() > 0
+except (ImportError, RuntimeError):
+    # No CuPy, or CuPy without a usable CUDA device
+    CUPY_AVAILABLE = False
+
+
+def difference_variance_sweep(phis, U_bs_mat, psi_vec, n_lo_diag, I_diff_diag, I_diff_sq_diag,
+                              xp=np):
+    """Var(n_a - n_b) after LO phase phi and the homodyne BS, for each phi in phis.
+
+    All phases go through the BS as one batched matmul on the array module xp (cupy or numpy).
+    """
+    phase_grid = xp.exp(1j * xp.outer(xp.asarray(phis), xp.asarray(n_lo_diag)))
+    probs = xp.abs((phase_grid * xp.asarray(psi_vec)) @ xp.asarray(U_bs_mat).T)**2
+    m1 = probs @ xp.asarray(I_diff_diag)
+    m2 = probs @ xp.asarray(I_diff_sq_diag)
+    var = xp.abs(m2 - m1 * m1)
+    return var if xp is np else xp.asnumpy(var)
+
+
 # Extract parameters from designer's specification
 cutoff_dim = 15  # Higher cutoff for squeezed states (non-classical photon statistics)
+# The squeezed mode alone needs only required_cutoff(r=0.045) = 7 (qutip_ops_cache), but the
+# cutoff is shared with the LO mode, whose |alpha| ~ 730 is far beyond any cutoff; lowering it
+# would change the recorded LO truncation and therefore every homodyne result
 
 # Physical parameters from components
 wavelength_seed = 1064e-9  # meters
@@ -40,11 +72,8 @@ squeezing_param = coupling_strength * np.sqrt(pump_threshold_ratio)  # r paramet
 squeeze_r = squeezing_param
 squeeze_phi = 0  # Squeeze phase quadrature (X quadrature)
 
-# Create squeezed vacuum state
-S = qt.squeeze(cutoff_dim, squeeze_r * np.exp(1j * squeeze_phi))
-vacuum = qt.fock(cutoff_dim, 0)
-squeezed_vacuum = S * vacuum
-squeezed_vacuum = squeezed_vacuum.unit()
+# Create squeezed vacuum state S(r e^{iφ})|0⟩ from its closed-form Fock amplitudes
+squeezed_state = squeezed_vacuum(cutoff_dim, squeeze_r * np.exp(1j * squeeze_phi))
 
 # Step 2: Local oscillator preparation
 # Phase-coherent LO derived from same 1064nm seed (reflected from dichroic)
@@ -54,21 +83,18 @@ lo_coherent_amplitude = np.sqrt(lo_photon_rate * 1e-9)  # Normalized for coheren
 
 # LO coherent state (strong local oscillator)
 lo_alpha = lo_coherent_amplitude
-lo_state = qt.coherent(cutoff_dim, lo_alpha)
+lo_state = coherent_ket(cutoff_dim, lo_alpha)
 lo_state = lo_state.unit()
 
 # Step 3: Mode matching and beam splitter interference
 # Two-mode state: squeezed vacuum + LO
 # Mode 0: Squeezed vacuum, Mode 1: LO
-psi_combined = qt.tensor(squeezed_vacuum, lo_state)
+psi_combined = qt.tensor(squeezed_state, lo_state)
 psi_combined = psi_combined.unit()
 
 # 50:50 beam splitter (homodyne BS)
 theta_bs = np.pi / 4  # 50:50 beam splitter
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_bs = (-1j * H_bs).expm()
+U_bs = qt.Qobj(bs_unitary_2mode(cutoff_dim, theta_bs), dims=[[cutoff_dim]*2, [cutoff_dim]*2])
 
 # Step 4: Balanced homodyne detection
 # Measure difference photocurrent at different LO phases
@@ -77,35 +103,28 @@ U_bs = (-1j * H_bs).expm()
 n_a = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))
 n_b = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim))
 
-# Measure quadratures at different phases (rotate LO phase)
+# Dense inputs for the batched phase sweep
+psi_vec = psi_combined.full().ravel()
+U_bs_mat = U_bs.full()
+n_a_diag = np.repeat(np.arange(cutoff_dim), cutoff_dim)  # Signal (mode 0) photon number per state
+n_lo_diag = np.tile(np.arange(cutoff_dim), cutoff_dim)  # LO (mode 1) photon number per basis state
+# Balanced homodyne: difference photocurrent n_a - n_b is diagonal in the Fock basis
+I_diff_diag = (n_a_diag - n_lo_diag).astype(float)
+I_diff_sq_diag = I_diff_diag**2
+
+# Measure quadratures at different phases (rotate LO phase), batched on the GPU when
+# available, otherwise with NumPy
 phases = np.linspace(0, 2*np.pi, 180)
-quadrature_variances = []
-
-for phi in phases:
-    # Rotate LO phase
-    phase_op = qt.tensor(qt.qeye(cutoff_dim), (1j * phi * qt.num(cutoff_dim)).expm())
-    psi_phase = phase_op * psi_combined
-    psi_phase = psi_phase.unit()
-    psi_phase_bs = U_bs * psi_phase
-    psi_phase_bs = psi_phase_bs.unit()
-    
-    # Balanced homodyne: difference photocurrent
-    I_diff = n_a - n_b
-    mean_I = qt.expect(I_diff, psi_phase_bs)
-    mean_I2 = qt.expect(I_diff * I_diff, psi_phase_bs)
-    var_I = abs(mean_I2 - mean_I**2)
-    
-    # Normalize by LO photon number for quadrature variance
-    # Homodyne gain factor: 4 * |alpha|^2 for difference photocurrent
-    lo_photon_number = abs(lo_alpha)**2
-    if lo_photon_number > 1e-10:
-        var_quadrature = var_I / (4 * lo_photon_number)
-    else:
-        var_quadrature = var_I
-    
-    quadrature_variances.append(var_quadrature)
-
-quadrature_variances = np.array(quadrature_variances)
+var_I = difference_variance_sweep(phases, U_bs_mat, psi_vec, n_lo_diag.astype(float), I_diff_diag,
+                                  I_diff_sq_diag, xp=cp if CUPY_AVAILABLE else np)
+
+# Normalize by LO photon number for quadrature variance
+# Homodyne gain factor: 4 * |alpha|^2 for difference photocurrent
+lo_photon_number = abs(lo_alpha)**2
+if lo_photon_number > 1e-10:
+    quadrature_variances = var_I / (4 * lo_photon_number)
+else:
+    quadrature_variances = var_I
 
 # Shot noise level (vacuum state variance in normalized quadrature units)
 vacuum_var = 1.0  # Standard quantum limit
@@ -121,7 +140,6 @@ antisqueezing_dB = float(10 * np.log10(max(max_variance / vacuum_var, 1e-10)))
 # Step 5: Calculate validation metrics
 # Photon number statistics (after BS, no phase shift)
 psi_after_bs = U_bs * psi_combined
-psi_after_bs = psi_after_bs.unit()
 
 mean_photons_a = float(abs(qt.expect(n_a, psi_after_bs)))
 mean_photons_b = float(abs(qt.expect(n_b, psi_after_bs)))
@@ -131,23 +149,16 @@ total_photons = float(mean_photons_a + mean_photons_b)
 input_photons = abs(lo_alpha)**2
 photon_conservation_error = float(abs(total_photons - input_photons) / (input_photons + 1e-10))
 
-# Purity of squeezed state
-rho_squeezed = squeezed_vacuum * squeezed_vacuum.dag()
-purity_squeezed = float(abs((rho_squeezed * rho_squeezed).tr()))
+# Purity of squeezed state (pure ket: |⟨ψ|ψ⟩|²)
+purity_squeezed = float(abs(squeezed_state.overlap(squeezed_state))**2)
 
 # Homodyne visibility (interference contrast)
 # Measure photocurrent difference at different phases
-photocurrents = []
-for phi in [0, np.pi/2, np.pi, 3*np.pi/2]:
-    phase_op = qt.tensor(qt.qeye(cutoff_dim), (1j * phi * qt.num(cutoff_dim)).expm())
-    psi_phase = phase_op * psi_combined
-    psi_phase = psi_phase.unit()
-    psi_phase_bs = U_bs * psi_phase
-    psi_phase_bs = psi_phase_bs.unit()
-    
-    I_a = abs(qt.expect(n_a, psi_phase_bs))
-    I_b = abs(qt.expect(n_b, psi_phase_bs))
-    photocurrents.append(I_a - I_b)
+# Rotating the LO phase (mode 1) before the homodyne BS, all four phases at once
+visibility_outputs = beam_splitter_sweep(cutoff_dim, psi_vec, [0, np.pi/2, np.pi, 3*np.pi/2],
+                                         theta_bs, phase_mode=1)
+I_a, I_b = np.abs(port_photon_numbers(cutoff_dim, visibility_outputs))
+photocurrents = I_a - I_b
 
 I_max = float(np.max(photocurrents))
 I_min = float(np.min(photocurrents))
@@ -1,35 +1,29 @@
 # REASONING: Validating designer's unbalanced Mach-Zehnder interferometer with asymmetric path lengths and variable delay stage
 
+import sys
+from pathlib import Path
+
 import qutip as qt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from qutip_ops_cache import beam_splitter_sweep, bs_unitary_2mode, port_photon_numbers
+
 # Extract parameters from designer's specification
-cutoff_dim = 5
+cutoff_dim = 5  # qutip_ops_cache.required_cutoff(alpha=sqrt(0.1)): 5 at a 1e-6 tail, 7 at 1e-10
 wavelength = 632.8e-9  # HeNe laser wavelength in meters
 laser_power = 5e-3  # 5 mW
 transmittance = 0.5  # 50:50 beam splitters
 detector_efficiency = 0.85
 
 # Calculate path lengths from component positions
-# Upper path: (1,3) -> (3,3) -> (5,5) -> (7,5) -> (8.5,3) -> (9.5,4)
-upper_segments = [
-    np.sqrt((3-1)**2 + (3-3)**2),  # Laser to Input BS
-    np.sqrt((5-3)**2 + (5-3)**2),  # Input BS to Upper Mirror
-    np.sqrt((7-5)**2 + (5-5)**2),  # Upper Mirror to Delay Stage
-    np.sqrt((8.5-7)**2 + (3-5)**2),  # Delay Stage to Output BS
-    np.sqrt((9.5-8.5)**2 + (4-3)**2)  # Output BS to Detector 1
-]
-upper_path_length = sum(upper_segments)
-
-# Lower path: (1,3) -> (3,3) -> (4.5,1) -> (6.5,1) -> (8.5,3) -> (8.5,1.5)
-lower_segments = [
-    np.sqrt((3-1)**2 + (3-3)**2),  # Laser to Input BS
-    np.sqrt((4.5-3)**2 + (1-3)**2),  # Input BS to Lower Mirror 1
-    np.sqrt((6.5-4.5)**2 + (1-1)**2),  # Lower Mirror 1 to Lower Mirror 2
-    np.sqrt((8.5-6.5)**2 + (3-1)**2),  # Lower Mirror 2 to Output BS
-    np.sqrt((8.5-8.5)**2 + (1.5-3)**2)  # Output BS to Detector 2
-]
-lower_path_length = sum(lower_segments)
+# Upper path: Laser -> Input BS -> Upper Mirror -> Delay Stage -> Output BS -> Detector 1
+upper_points = np.array([(1, 3), (3, 3), (5, 5), (7, 5), (8.5, 3), (9.5, 4)])
+upper_path_length = np.linalg.norm(np.diff(upper_points, axis=0), axis=1).sum()
+
+# Lower path: Laser -> Input BS -> Lower Mirror 1 -> Lower Mirror 2 -> Output BS -> Detector 2
+lower_points = np.array([(1, 3), (3, 3), (4.5, 1), (6.5, 1), (8.5, 3), (8.5, 1.5)])
+lower_path_length = np.linalg.norm(np.diff(lower_points, axis=0), axis=1).sum()
 
 # Path length difference
 path_difference = lower_path_length - upper_path_length
@@ -38,48 +32,34 @@ base_phase_diff = 2 * np.pi * path_difference / wavelength
 # Step 1: Create initial coherent state (approximating laser)
 # Use weak coherent state with mean photon number ~0.1 for quantum regime
 alpha = np.sqrt(0.1)
-initial_state = qt.tensor(qt.coherent(cutoff_dim, alpha), qt.fock(cutoff_dim, 0))
-initial_state = initial_state.unit()
+# Work on plain arrays from here on: |α⟩ ⊗ |0⟩ as a flat vector indexed n0*d + n1
+coherent_amps = qt.coherent(cutoff_dim, alpha).full().ravel()
+initial_state = np.kron(coherent_amps, np.eye(cutoff_dim)[0])
+initial_state /= np.linalg.norm(initial_state)
 
 # Step 2: Input beam splitter (50:50, cube type)
 theta_bs = np.pi/4  # 50:50 beam splitter angle
-a = qt.tensor(qt.destroy(cutoff_dim), qt.qeye(cutoff_dim))
-b = qt.tensor(qt.qeye(cutoff_dim), qt.destroy(cutoff_dim))
-H_bs = theta_bs * (a.dag() * b + a * b.dag())
-U_input_bs = (-1j * H_bs).expm()
-state_after_split = U_input_bs * initial_state
-state_after_split = state_after_split.unit()
+# Closed-form SU(2) unitary, cached per (cutoff, θ) and shared with the output BS
+U_bs = bs_unitary_2mode(cutoff_dim, theta_bs)
+state_after_split = U_bs @ initial_state
 
 # Step 3: Apply path length difference phase shift to upper arm (mode 0)
 # Test multiple delay stage positions to demonstrate interference
 delay_positions = [0, 25, 50, 75, 100]  # micrometers
 visibilities = []
-intensities_det1 = []
-intensities_det2 = []
-
-for delay_um in delay_positions:
-    delay_m = delay_um * 1e-6  # Convert to meters
-    total_phase = base_phase_diff + 2 * np.pi * delay_m / wavelength
-    
-    # Apply phase shift to upper arm (mode 0)
-    phase_op = qt.tensor((1j * total_phase * qt.num(cutoff_dim)).expm(), qt.qeye(cutoff_dim))
-    state_with_phase = phase_op * state_after_split
-    state_with_phase = state_with_phase.unit()
-    
-    # Step 4: Output beam splitter (recombination)
-    U_output_bs = (-1j * H_bs).expm()
-    final_state = U_output_bs * state_with_phase
-    final_state = final_state.unit()
-    
-    # Step 5: Measure at detectors with efficiency
-    n_mode0 = qt.tensor(qt.num(cutoff_dim), qt.qeye(cutoff_dim))  # Detector 1 path
-    n_mode1 = qt.tensor(qt.qeye(cutoff_dim), qt.num(cutoff_dim))  # Detector 2 path
-    
-    intensity_1 = float(abs(qt.expect(n_mode0, final_state))) * detector_efficiency
-    intensity_2 = float(abs(qt.expect(n_mode1, final_state))) * detector_efficiency
-    
-    intensities_det1.append(intensity_1)
-    intensities_det2.append(intensity_2)
+delays_m = np.array(delay_positions) * 1e-6  # Convert to meters
+total_phases = base_phase_diff + 2 * np.pi * delays_m / wavelength
+
+# Step 4: Output beam splitter (recombination) and Step 5: measure at detectors with
+# efficiency. The upper-arm phase is diagonal, so every phase goes through the cached
+# output BS in one sweep; the phase = 0 and phase = π verification points ride along
+# at the front of the same sweep.
+all_phases = np.concatenate([[0.0, np.pi], total_phases])
+output_states = beam_splitter_sweep(cutoff_dim, state_after_split, all_phases, theta_bs,
+                                    phase_mode=0)
+I_det1, I_det2 = port_photon_numbers(cutoff_dim, output_states) * detector_efficiency
+intensities_det1 = [float(v) for v in I_det1[2:]]
+intensities_det2 = [float(v) for v in I_det2[2:]]
 
 # Calculate visibility from detector 1 measurements
 I_max_det1 = max(intensities_det1)
@@ -96,19 +76,9 @@ total_intensities = [i1 + i2 for i1, i2 in zip(intensities_det1, intensities_det
 energy_conservation = float(np.std(total_intensities) / np.mean(total_intensities))
 
 # Test specific phase points for theoretical verification
-# Phase = 0 case
-phase_0_op = qt.tensor(qt.qeye(cutoff_dim), qt.qeye(cutoff_dim))
-state_phase_0 = U_output_bs * (phase_0_op * state_after_split)
-state_phase_0 = state_phase_0.unit()
-intensity_0_det1 = float(abs(qt.expect(n_mode0, state_phase_0))) * detector_efficiency
-intensity_0_det2 = float(abs(qt.expect(n_mode1, state_phase_0))) * detector_efficiency
-
-# Phase = π case
-phase_pi_op = qt.tensor((1j * np.pi * qt.num(cutoff_dim)).expm(), qt.qeye(cutoff_dim))
-state_phase_pi = U_output_bs * (phase_pi_op * state_after_split)
-state_phase_pi = state_phase_pi.unit()
-intensity_pi_det1 = float(abs(qt.expect(n_mode0, state_phase_pi))) * detector_efficiency
-intensity_pi_det2 = float(abs(qt.expect(n_mode1, state_phase_pi))) * detector_efficiency
+# Phase = 0 and phase = π cases, taken from the front of the sweep above
+intensity_0_det1, intensity_pi_det1 = float(I_det1[0]), float(I_det1[1])
+intensity_0_det2, intensity_pi_det2 = float(I_det2[0]), float(I_det2[1])
 
 # Verify complementary behavior (anti-correlation)
 complementarity = float(abs((intensity_0_det1 - intensity_pi_det1) + (intensity_pi_det2 - intensity_0_det2)) / 
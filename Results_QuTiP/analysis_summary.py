@@ -3,37 +3,66 @@
 Extract structured data from all experimental results for journal article.
 """
 
+import hashlib
 import json
 import re
 from pathlib import Path
 
+# Section patterns in 05_deep_analysis.md, compiled once for all experiments.
+# They are bytes patterns: the markers are ASCII, so files are searched undecoded and
+# only the captured groups are decoded.
+_RE_NAME = re.compile(rb'\*\*Experiment:\*\* (.+)')
+_RE_RATING = re.compile(rb'\*\*Quality Rating:\*\* (\d+)/10 \((\w+)\)')
+_RE_KEY = re.compile(rb'## Key Insight\n\n(.+?)(?=\n\n##|\Z)', re.DOTALL)
+_RE_CONC = re.compile(rb'## Conclusion\n\n(.+?)(?=\n\n|\Z)', re.DOTALL)
+
+# Simulation limitation markers as one case-insensitive alternation: a single scan that
+# stops at the first hit, with no lowercased copy of the file
+_RE_SIM_LIM = re.compile(
+    rb'fock state|cannot capture|cannot model|missing|temporal|catastrophic|critical flaw',
+    re.IGNORECASE
+)
+
+# Experiment name keywords -> category, checked in order; first match wins
+_CAT_PATTERNS = [
+    (re.compile(r'interferometer'), 'Interferometry'),
+    (re.compile(r'bell|entangle|ghz'), 'Entanglement'),
+    (re.compile(r'teleportation'), 'Quantum Communication'),
+    (re.compile(r'squeezed|parametric'), 'Nonlinear Optics'),
+    (re.compile(r'hong-ou-mandel|hom'), 'Quantum Interference'),
+    (re.compile(r'bb84|qkd|key distribution'), 'Quantum Communication'),
+    (re.compile(r'boson sampling'), 'Quantum Computation'),
+    (re.compile(r'eit|transparency'), 'Atomic Physics'),
+    (re.compile(r'frequency'), 'Quantum Conversion'),
+]
+
 def extract_experiment_data(analysis_path):
     """Extract key information from deep analysis markdown."""
-    with open(analysis_path, 'r') as f:
+    with open(analysis_path, 'rb') as f:
         content = f.read()
     
     data = {}
     
     # Extract experiment name
-    match = re.search(r'\*\*Experiment:\*\* (.+)', content)
-    data['name'] = match.group(1) if match else "Unknown"
+    match = _RE_NAME.search(content)
+    data['name'] = match.group(1).decode('utf-8') if match else "Unknown"
     
     # Extract quality rating
-    match = re.search(r'\*\*Quality Rating:\*\* (\d+)/10 \((\w+)\)', content)
+    match = _RE_RATING.search(content)
     if match:
         data['rating'] = int(match.group(1))
-        data['rating_label'] = match.group(2)
+        data['rating_label'] = match.group(2).decode('utf-8')
     else:
         data['rating'] = 0
         data['rating_label'] = "UNKNOWN"
     
     # Extract key insight
-    match = re.search(r'## Key Insight\n\n(.+?)(?=\n\n##|\Z)', content, re.DOTALL)
-    data['key_insight'] = match.group(1).strip() if match else ""
+    match = _RE_KEY.search(content)
+    data['key_insight'] = match.group(1).decode('utf-8').strip() if match else ""
     
     # Extract conclusion
-    match = re.search(r'## Conclusion\n\n(.+?)(?=\n\n|\Z)', content, re.DOTALL)
-    data['conclusion'] = match.group(1).strip() if match else ""
+    match = _RE_CONC.search(content)
+    data['conclusion'] = match.group(1).decode('utf-8').strip() if match else ""
     
     # Determine if design was good regardless of simulation
     design_quality_markers = [
@@ -44,53 +73,58 @@ def extract_experiment_data(analysis_path):
     ]
     
     # Check if simulation limitations mentioned
-    simulation_limitations = [
-        "fock state",
-        "cannot capture",
-        "cannot model",
-        "missing",
-        "temporal",
-        "catastrophic",
-        "critical flaw"
-    ]
-    
-    content_lower = content.lower()
-    data['has_simulation_limitations'] = any(marker in content_lower for marker in simulation_limitations)
+    data['has_simulation_limitations'] = bool(_RE_SIM_LIM.search(content))
     
     # Categorize experiment type
     name_lower = data['name'].lower()
-    if 'interferometer' in name_lower:
-        data['category'] = 'Interferometry'
-    elif 'bell' in name_lower or 'entangle' in name_lower or 'ghz' in name_lower:
-        data['category'] = 'Entanglement'
-    elif 'teleportation' in name_lower:
-        data['category'] = 'Quantum Communication'
-    elif 'squeezed' in name_lower or 'parametric' in name_lower:
-        data['category'] = 'Nonlinear Optics'
-    elif 'hong-ou-mandel' in name_lower or 'hom' in name_lower:
-        data['category'] = 'Quantum Interference'
-    elif 'bb84' in name_lower or 'qkd' in name_lower or 'key distribution' in name_lower:
-        data['category'] = 'Quantum Communication'
-    elif 'boson sampling' in name_lower:
-        data['category'] = 'Quantum Computation'
-    elif 'eit' in name_lower or 'transparency' in name_lower:
-        data['category'] = 'Atomic Physics'
-    elif 'frequency' in name_lower:
-        data['category'] = 'Quantum Conversion'
-    else:
-        data['category'] = 'Other'
+    data['category'] = 'Other'
+    for pattern, category in _CAT_PATTERNS:
+        if pattern.search(name_lower):
+            data['category'] = category
+            break
     
     return data
 
 def main():
     results_dir = Path(__file__).parent
     
+    analysis_files = sorted(results_dir.glob('*/05_deep_analysis.md'))
+    
+    # Parsed results from earlier runs, keyed by path relative to results_dir and valid
+    # while (mtime, size) match. The whole cache is tied to a digest of this script, so
+    # any change to the parser or the category patterns discards it.
+    cache_file = results_dir / '.summary_cache.json'
+    parser_version = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16).hexdigest()
+    try:
+        with open(cache_file) as f:
+            stored = json.load(f)
+        cache = stored['entries'] if stored.get('parser') == parser_version else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        cache = {}
+    
+    stamps = {}
+    for analysis_file in analysis_files:
+        st = analysis_file.stat()
+        stamps[analysis_file.relative_to(results_dir).as_posix()] = [st.st_mtime_ns, st.st_size]
+    stale = [p for p, key in zip(analysis_files, stamps)
+             if cache.get(key, [None, None])[:2] != stamps[key]]
+    
+    # Parse only the files that changed; they are small, so a serial pass is fastest
+    for analysis_file in stale:
+        key = analysis_file.relative_to(results_dir).as_posix()
+        cache[key] = stamps[key] + [extract_experiment_data(analysis_file)]
+    
     experiments = []
-    for analysis_file in sorted(results_dir.glob('*/05_deep_analysis.md')):
-        data = extract_experiment_data(analysis_file)
+    for analysis_file, key in zip(analysis_files, stamps):
+        data = dict(cache[key][2])
         data['directory'] = analysis_file.parent.name
         experiments.append(data)
     
+    # Drop entries for files that no longer exist, then persist for the next run
+    cache = {key: entry for key, entry in cache.items() if key in stamps}
+    with open(cache_file, 'w') as f:
+        json.dump({'parser': parser_version, 'entries': cache}, f)
+    
     # Save as JSON
     output_file = results_dir / 'experiments_summary.json'
     with open(output_file, 'w') as f:
@@ -102,13 +136,17 @@ def main():
     # Print summary statistics
     print("\n=== SUMMARY STATISTICS ===\n")
     
-    # Rating distribution
+    # Rating distribution, with the label of the first experiment seen at each rating
     from collections import Counter
-    ratings = Counter([e['rating'] for e in experiments])
+    ratings = Counter()
+    rating_to_label = {}
+    for e in experiments:
+        ratings[e['rating']] += 1
+        rating_to_label.setdefault(e['rating'], e['rating_label'])
     print("Rating Distribution:")
     for rating in sorted(ratings.keys(), reverse=True):
         count = ratings[rating]
-        label = [e['rating_label'] for e in experiments if e['rating'] == rating][0]
+        label = rating_to_label[rating]
         print(f"  {rating}/10 ({label:10s}): {count} experiments")
     
     # Category distribution
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Shared operator matrices and basis kets for the archived QuTiP simulation scripts.
+"""
+
+from functools import lru_cache
+from math import comb, factorial, sqrt
+
+import numpy as np
+import qutip as qt
+from scipy.linalg import eigh_tridiagonal, expm
+
+
+@lru_cache(maxsize=None)
+def bs_unitary_2mode(d, theta):
+    """Dense beam splitter unitary exp(-iθ(a†b + ab†)) on two modes truncated at d.
+
+    Basis states |na, nb⟩ are indexed na*d + nb, matching qt.tensor ordering.
+    Photon-number sectors that fit inside the cutoff (na + nb < d) use the SU(2)
+    closed form a† → cos θ a† - i sin θ b†; sectors clipped by the cutoff are
+    exponentiated directly so the result equals the truncated (-1j*H).expm().
+    The returned array is read-only because it is shared between callers.
+    """
+    c, s = np.cos(theta), -1j * np.sin(theta)
+    U = np.zeros((d * d, d * d), dtype=complex)
+
+    for n in range(2 * d - 1):
+        sector = [(k, n - k) for k in range(max(0, n - d + 1), min(n, d - 1) + 1)]
+        if n < d:
+            # (c a† + s b†)^k (c b† + s a†)^l |0⟩ / sqrt(k! l!), expanded binomially
+            for k, l in sector:
+                for i in range(k + 1):
+                    for j in range(l + 1):
+                        m = k - i + j  # photons ending up in mode a
+                        amp = comb(k, i) * comb(l, j) * c**(k - i + l - j) * s**(i + j)
+                        norm = sqrt(factorial(m) * factorial(n - m) / (factorial(k) * factorial(l)))
+                        U[m * d + (n - m), k * d + l] += amp * norm
+        else:
+            idx = [k * d + l for k, l in sector]
+            H_block = np.zeros((len(sector), len(sector)))
+            for col, (k, l) in enumerate(sector[:-1]):
+                # a†b|k, l⟩ = sqrt((k + 1) l)|k + 1, l - 1⟩, the next state in the sector
+                H_block[col + 1, col] = H_block[col, col + 1] = theta * sqrt((k + 1) * l)
+            U[np.ix_(idx, idx)] = expm(-1j * H_block)
+
+    U.setflags(write=False)
+    return U
+
+
+def required_cutoff(alpha=0.0, r=0.0, tol=1e-10):
+    """Smallest Fock cutoff d whose discarded population (n >= d) is below tol.
+
+    alpha sizes a coherent state (Poisson tail), r a squeezed vacuum (even-n tail from the
+    closed-form amplitudes used by squeezed_vacuum); when both are given, e.g. for a cutoff
+    shared by a coherent and a squeezed mode, the larger requirement is returned.
+    """
+    from scipy.stats import poisson  # ~0.5 s to import, so only for scripts that size a cutoff
+
+    d_coherent = int(poisson.isf(tol, abs(alpha)**2)) + 1
+
+    t, p = np.tanh(r)**2, 1 / np.cosh(r)  # P(0) for the squeezed vacuum
+    mass, n = p, 0
+    while 1 - mass > tol:
+        n += 1
+        p *= t * (2 * n) * (2 * n - 1) / (4 * n * n)
+        mass += p
+    return max(d_coherent, 2 * n + 1)
+
+
+def beam_splitter_sweep(d, psi, phis, theta, phase_mode=1):
+    """Two-mode output states U_bs(θ) exp(iφ n_phase_mode)|ψ⟩ for every φ in phis.
+
+    psi is a two-mode ket (Qobj or flat array indexed na*d + nb). The phase shifter is
+    diagonal in the Fock basis, so all phases are applied as one (len(phis), d*d) grid and
+    pushed through the cached beam splitter in a single matrix product; rows of the
+    returned array are the output amplitudes. A negative theta gives U_bs(θ)†.
+    """
+    psi_vec = psi.full().ravel() if isinstance(psi, qt.Qobj) else np.asarray(psi).ravel()
+    n = np.arange(d)
+    n_phase = np.tile(n, d) if phase_mode == 1 else np.repeat(n, d)
+    phase_grid = np.exp(1j * np.outer(phis, n_phase))
+    return (phase_grid * psi_vec) @ bs_unitary_2mode(d, theta).T
+
+
+def port_photon_numbers(d, states):
+    """Mean photon number in each output port for rows of two-mode amplitudes.
+
+    Returns a (2, len(states)) array: row 0 is mode 0, row 1 is mode 1.
+    """
+    n = np.arange(d)
+    return np.stack([np.repeat(n, d), np.tile(n, d)]) @ (np.abs(states)**2).T
+
+
+def basis_ket(d, occupations):
+    """Fock basis ket |n0, n1, ...⟩ over len(occupations) modes truncated at d.
+
+    Writes a single 1 at the composite index instead of tensoring qt.fock kets.
+    """
+    idx = 0
+    for n in occupations:
+        idx = idx * d + n
+    vec = np.zeros((d ** len(occupations), 1), dtype=complex)
+    vec[idx, 0] = 1.0
+    return qt.Qobj(vec, dims=[[d] * len(occupations), [1] * len(occupations)])
+
+
+def coherent_ket(d, alpha):
+    """Coherent state D(α)|0⟩ truncated at d, equal to qt.coherent's default operator method.
+
+    The truncated generator αa† - α*a is, up to the diagonal gauge (i e^{iθ})^n, -i|α| times
+    the real tridiagonal matrix with off-diagonals sqrt(n), so its first column follows from
+    one eigh_tridiagonal call instead of a dense expm.
+    """
+    r, theta = abs(alpha), np.angle(alpha)
+    lam, V = eigh_tridiagonal(np.zeros(d), np.sqrt(np.arange(1, d)))
+    amps = (1j * np.exp(1j * theta))**np.arange(d) * (V @ (V[0] * np.exp(-1j * r * lam)))
+    return qt.Qobj(amps.reshape(d, 1))
+
+
+def phase_shift(d, phi):
+    """Single-mode phase shifter exp(iφn), built directly as a diagonal Qobj."""
+    return qt.Qobj(np.diag(np.exp(1j * phi * np.arange(d))))
+
+
+def squeezed_vacuum(d, z):
+    """Squeezed vacuum S(z)|0⟩ truncated at d, from the closed-form Fock amplitudes.
+
+    ⟨2n|S(r e^{iθ})|0⟩ = (-e^{iθ} tanh r)^n sqrt((2n)!) / (2^n n! sqrt(cosh r)),
+    matching qt.squeeze's convention; the truncated ket is renormalised.
+    """
+    r, theta = abs(z), np.angle(z)
+    vec = np.zeros((d, 1), dtype=complex)
+    for n in range((d + 1) // 2):
+        vec[2 * n, 0] = ((-np.exp(1j * theta) * np.tanh(r))**n * sqrt(factorial(2 * n))
+                         / (2**n * factorial(n) * sqrt(np.cosh(r))))
+    return qt.Qobj(vec / np.linalg.norm(vec))
@@ -10,20 +10,19 @@ import numpy as np
 import time
 import json
 import re
+import functools
+import contextlib
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-import matplotlib.pyplot as plt
 
 # Add modules to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 sys.path.insert(0, str(Path(__file__).parent))
 
-# Import LLM-driven designer
-from llm_designer import LLMDesigner
-from agentic_quantum.llm import SimpleLLM
-from simple_optical_table import create_optical_table_figure
-from freeform_simulation_agent import FreeFormSimulationAgent
-# Quantum primitives (states & operations) used by the simulator
-from agentic_quantum.quantum import FockState, BeamSplitter, PhaseShift
+# The LLM stack, quantum primitives and matplotlib are imported inside the functions
+# that use them, so a cold page load does not pay for them
 
 # Page config
 st.set_page_config(
@@ -33,521 +32,31 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for beautiful dark warm UI
-st.markdown("""
-<style>
-    /* Dark warm background - allow natural scrolling if needed */
-    .stApp {
-        background: linear-gradient(135deg, #1a1410 0%, #2d1810 50%, #1a1410 100%);
-        min-height: 100vh;
-    }
-    
-    /* Allow body to breathe - no forced constraints */
-    html, body {
-        height: 100vh;
-        overflow-x: hidden;
-    }
-    
-    /* Main content area - natural flow */
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-        max-width: 100%;
-        padding-left: 2rem;
-        padding-right: 2rem;
-    }
-    
-    /* Header styling - compact for no-scroll layout */
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 300;
-        color: #f0d9c0;
-        text-align: center;
-        padding: 0.5rem 0 0.2rem 0;
-        letter-spacing: 2px;
-        margin-bottom: 0 !important;
-    }
-    
-    .devanagari {
-        font-size: 1.8rem;
-        color: #d4a574;
-        opacity: 0.8;
-    }
-    
-    .subtitle {
-        text-align: center;
-        color: #a08060;
-        font-size: 0.85rem;
-        margin-bottom: 0.5rem !important;
-        margin-top: 0 !important;
-        font-style: italic;
-    }
-    
-    /* Input styling */
-    .stTextInput {
-        max-width: 100% !important;
-        margin: 0 !important;
-        min-height: 45px !important;
-    }
-    
-    .stTextInput > div {
-        background-color: transparent !important;
-        border: none !important;
-        overflow: visible !important;
-        min-height: 45px !important;
-    }
-    
-    .stTextInput > div > div {
-        background-color: transparent !important;
-        border: none !important;
-        overflow: visible !important;
-        min-height: 45px !important;
-    }
-    
-    .stTextInput input {
-        background-color: rgba(30, 24, 20, 0.6) !important;
-        color: #ffffff !important;
-        border: 1px solid rgba(212, 165, 116, 0.3) !important;
-        border-radius: 12px !important;
-        font-size: 1rem !important;
-        padding: 0.8rem 1.2rem !important;
-        text-align: left !important;
-        height: 45px !important;
-        min-height: 45px !important;
-        line-height: 1.5rem !important;
-        transition: all 0.3s ease !important;
-        box-sizing: border-box !important;
-        overflow: visible !important;
-        width: 100% !important;
-    }
-    
-    .stTextInput input:focus {
-        border-color: #d4a574 !important;
-        box-shadow: 0 0 0 2px rgba(212, 165, 116, 0.3) !important;
-        outline: none !important;
-        background-color: rgba(30, 24, 20, 0.8) !important;
-        color: #ffffff !important;
-    }
-    
-    .stTextInput input::placeholder {
-        color: rgba(160, 128, 96, 0.6) !important;
-        text-align: left !important;
-        font-size: 0.95rem !important;
-        line-height: 1.5rem !important;
-    }
-    
-    /* Hide all input instructions */
-    .stTextInput [data-testid="InputInstructions"] {
-        display: none !important;
-    }
-    
-    .stTextInput label {
-        display: none !important;
-    }
-    
-    /* Form styling */
-    .stForm {
-        max-width: 800px !important;
-        margin: 0 auto !important;
-    }
-    
-    /* Button styling */
-    .stButton {
-        text-align: center !important;
-        margin-top: 0.5rem !important;
-    }
-    
-    .stButton button {
-        background: linear-gradient(135deg, #d4a574 0%, #b8865f 100%) !important;
-        color: #1a1410 !important;
-        border: none !important;
-        border-radius: 8px !important;
-        padding: 0.6rem 1.5rem !important;
-        font-weight: 600 !important;
-        font-size: 0.95rem !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 16px rgba(212, 165, 116, 0.3) !important;
-    }
-    
-    /* Result boxes */
-    .success-box {
-        background: rgba(76, 175, 80, 0.1);
-        border-left: 4px solid #4CAF50;
-        padding: 1.5rem;
-        margin: 1.5rem 0;
-        border-radius: 8px;
-        color: #a8e6a3;
-    }
-    
-    .error-box {
-        background: rgba(244, 67, 54, 0.1);
-        border-left: 4px solid #f44336;
-        padding: 1.5rem;
-        margin: 1.5rem 0;
-        border-radius: 8px;
-        color: #ffcdd2;
-    }
-    
-    /* Glowing golden progress bar with breathing effect */
-    div[data-testid="stProgress"] {
-        height: 20px !important;
-        background: transparent !important;
-        margin: 0.5rem 0 !important;
-    }
-    
-    /* Hide the container when progress is 0 or very small */
-    div[data-testid="stProgress"] > div[style*="width: 0%"],
-    div[data-testid="stProgress"] > div[style*="width: 0px"] {
-        display: none !important;
-    }
-    
-    /* Container - completely transparent, no background or border */
-    div[data-testid="stProgress"] > div {
-        background: transparent !important;
-        border: none !important;
-        box-shadow: none !important;
-        overflow: visible !important;
-        height: 20px !important;
-    }
-    
-    /* Target the actual progress fill bar with breathing glow - this is the ONLY visible element */
-    div[data-testid="stProgress"] > div > div > div > div {
-        background: linear-gradient(90deg, 
-            #d4a574 0%, 
-            #f4e4c1 40%, 
-            #ffb347 70%, 
-            #ffd700 100%) !important;
-        border-radius: 12px !important;
-        animation: breathing-glow 2s ease-in-out infinite !important;
-        height: 100% !important;
-        border: none !important;
-    }
-    
-    /* Override any Streamlit defaults */
-    .stProgress > div > div > div > div {
-        background: linear-gradient(90deg, #d4a574 0%, #f4e4c1 50%, #ffb347 100%) !important;
-    }
-    
-    /* Breathing glow animation - pulses smoothly like breathing */
-    @keyframes breathing-glow {
-        0% {
-            box-shadow: 
-                0 0 10px rgba(255, 179, 71, 0.4),
-                0 0 20px rgba(212, 165, 116, 0.3),
-                0 0 30px rgba(255, 215, 0, 0.2);
-            filter: brightness(1);
-        }
-        50% {
-            box-shadow: 
-                0 0 20px rgba(255, 179, 71, 0.8),
-                0 0 40px rgba(212, 165, 116, 0.6),
-                0 0 60px rgba(255, 215, 0, 0.4);
-            filter: brightness(1.2);
-        }
-        100% {
-            box-shadow: 
-                0 0 10px rgba(255, 179, 71, 0.4),
-                0 0 20px rgba(212, 165, 116, 0.3),
-                0 0 30px rgba(255, 215, 0, 0.2);
-            filter: brightness(1);
-        }
-    }
-    
-    /* Stage indicator styling */
-    .stage-indicator {
-        padding: 12px 20px;
-        background: linear-gradient(135deg, rgba(212, 165, 116, 0.15) 0%, rgba(244, 228, 193, 0.1) 100%);
-        border-left: 4px solid #d4a574;
-        border-radius: 8px;
-        margin: 10px 0;
-        font-size: 16px;
-        font-weight: 500;
-        color: #f0d9c0;
-        box-shadow: 0 2px 10px rgba(212, 165, 116, 0.2);
-        animation: slide-in 0.3s ease-out;
-    }
-    
-    @keyframes slide-in {
-        from {
-            opacity: 0;
-            transform: translateX(-20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateX(0);
-        }
-    }
-    
-    .stage-complete {
-        border-left-color: #4caf50;
-        background: linear-gradient(135deg, rgba(76, 175, 80, 0.15) 0%, rgba(129, 199, 132, 0.1) 100%);
-    }
-    
-    .stage-active {
-        border-left-color: #ffb347;
-        animation: pulse-border 2s ease-in-out infinite;
-    }
-    
-    @keyframes pulse-border {
-        0%, 100% {
-            border-left-color: #ffb347;
-            box-shadow: 0 2px 10px rgba(212, 165, 116, 0.2);
-        }
-        50% {
-            border-left-color: #d4a574;
-            box-shadow: 0 2px 20px rgba(255, 179, 71, 0.4);
-        }
-    }
-    
-    /* Metrics */
-    div[data-testid="metric-container"] {
-        background: rgba(240, 217, 192, 0.05);
-        border: 1px solid rgba(212, 165, 116, 0.2);
-        padding: 1rem;
-        border-radius: 8px;
-    }
-    
-    div[data-testid="metric-container"] label {
-        color: #a08060 !important;
-    }
-    
-    div[data-testid="metric-container"] [data-testid="stMetricValue"] {
-        color: #f0d9c0 !important;
-    }
-    
-    /* Info boxes */
-    .stInfo {
-        background: rgba(212, 165, 116, 0.1) !important;
-        color: #d4a574 !important;
-        border-left-color: #d4a574 !important;
-    }
-    
-    /* Headers */
-    h1, h2, h3, h4, h5, h6 {
-        color: #f0d9c0 !important;
-    }
-    
-    /* Regular text */
-    p, span, li {
-        color: #c0a080 !important;
-    }
-    
-    /* Clean form styling - REMOVE ALL SHADOWS AND BORDERS */
-    .stForm {
-        border: none !important;
-        padding: 0 !important;
-        background: transparent !important;
-        max-width: 800px !important;
-        margin: 0 auto !important;
-        box-shadow: none !important;
-    }
-    
-    .stForm > div {
-        border: none !important;
-        box-shadow: none !important;
-        background: transparent !important;
-    }
-    
-    /* Form submit buttons - visible and styled */
-    .stForm button[kind="formSubmit"] {
-        margin-top: 0.5rem !important;
-    }
-    
-    /* Form text input - NO SHADOWS */
-    .stForm .stTextInput {
-        max-width: 100% !important;
-    }
-    
-    .stForm .stTextInput > div {
-        box-shadow: none !important;
-        border: none !important;
-    }
-    
-    /* Hide all instruction messages */
-    [data-testid="InputInstructions"] {
-        display: none !important;
-    }
-    
-    /* Ensure text input wrapper doesn't clip content */
-    div[data-baseweb="base-input"] {
-        overflow: visible !important;
-        min-height: 45px !important;
-    }
-    
-    /* Hide default streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Hide deploy button and streamlit branding */
-    .stDeployButton {display: none !important;}
-    button[kind="header"] {display: none !important;}
-    [data-testid="stToolbar"] {display: none !important;}
-    [data-testid="stDecoration"] {display: none !important;}
-    [data-testid="stStatusWidget"] {display: none !important;}
-    
-    /* Hide horizontal rules for compact layout */
-    hr {
-        margin: 0.3rem 0 !important;
-        border-color: rgba(212, 165, 116, 0.1) !important;
-    }
-    
-    /* SVG diagram container */
-    .svg-container {
-        background: rgba(0, 0, 0, 0.3);
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    /* Smooth transition animations */
-    .welcome-container {
-        animation: fadeIn 0.5s ease-in;
-        max-width: 900px;
-        margin: 0 auto;
-    }
-    
-    .two-column-layout {
-        animation: expandWidth 0.6s ease-out;
-    }
-    
-    @keyframes fadeIn {
-        from {
-            opacity: 0;
-            transform: translateY(-20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    @keyframes expandWidth {
-        from {
-            opacity: 0.7;
-            max-width: 900px;
-            margin: 0 auto;
-        }
-        to {
-            opacity: 1;
-            max-width: 100%;
-            margin: 0;
-        }
-    }
-    
-    /* Columns with proper height constraints */
-    [data-testid="column"] {
-        padding: 0 1rem;
-        height: calc(100vh - 80px);
-        display: flex;
-        flex-direction: column;
-    }
-    
-    /* Chat pane styling */
-    .chat-container {
-        height: 100%;
-        display: flex;
-        flex-direction: column;
-    }
-    
-    .chat-messages {
-        flex: 1;
-        overflow-y: auto;
-        overflow-x: hidden;
-        max-height: calc(100vh - 180px);
-        padding-right: 0.5rem;
-        padding-bottom: 0.5rem;
-        margin-bottom: 0;
-        scroll-behavior: smooth;
-    }
-    
-    /* User message bubble - left aligned, no shadow */
-    .user-message {
-        background: linear-gradient(135deg, rgba(100, 150, 200, 0.15), rgba(120, 170, 220, 0.1));
-        border-left: 3px solid rgba(100, 150, 200, 0.5);
-        padding: 1rem 1.2rem;
-        border-radius: 12px 12px 12px 4px;
-        margin: 0.8rem 0;
-        margin-right: 15%;
-        color: #e8f4f8;
-    }
-    
-    /* AI message bubble - slightly right offset, no shadow */
-    .ai-message {
-        background: linear-gradient(135deg, rgba(212, 165, 116, 0.12), rgba(244, 228, 193, 0.08));
-        border-left: 3px solid rgba(212, 165, 116, 0.6);
-        padding: 1rem 1.2rem;
-        border-radius: 12px 12px 4px 12px;
-        margin: 0.8rem 0;
-        margin-left: 8%;
-        margin-right: 0;
-        color: #f4e4c1;
-    }
-    
-    /* Design pane styling */
-    .design-container {
-        height: 100%;
-    }
-    
-    /* Tab styling - BRIGHTER INACTIVE TABS */
-    button[data-baseweb="tab"] {
-        color: rgba(212, 165, 116, 0.9) !important;
-        font-weight: 500 !important;
-        opacity: 1 !important;
-    }
-    
-    button[data-baseweb="tab"]:hover {
-        color: rgba(212, 165, 116, 1) !important;
-        background-color: rgba(212, 165, 116, 0.1) !important;
-    }
-    
-    button[data-baseweb="tab"][aria-selected="true"] {
-        color: #d4a574 !important;
-        font-weight: 600 !important;
-        border-bottom-color: #d4a574 !important;
-    }
-    
-    /* Tab content area */
-    [data-testid="stTabContent"] {
-        color: #f0d9c0 !important;
-    }
-    
-    /* Button styling - ALL BUTTONS */
-    .stButton > button,
-    button[data-testid^="baseButton"] {
-        background-color: #3d2817 !important;
-        border: 1px solid #d4a574 !important;
-        color: #ffffff !important;
-    }
-    
-    .stButton > button:hover,
-    button[data-testid^="baseButton"]:hover {
-        background-color: #4d3520 !important;
-        border-color: #e0b888 !important;
-    }
-    
-    /* Force WHITE text in ALL buttons */
-    .stButton > button,
-    .stButton > button *,
-    button[data-testid^="baseButton"],
-    button[data-testid^="baseButton"] *,
-    button[data-testid^="baseButton"] p,
-    button[data-testid^="baseButton"] span,
-    button[data-testid^="baseButton"] div,
-    button p, button span, button div {
-        color: #ffffff !important;
-        font-weight: 500 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS for beautiful dark warm UI, kept in static/anubuddhi.css
+@st.cache_resource
+def _css_blob():
+    """Minified app stylesheet, read from static/anubuddhi.css once per server process."""
+    css = (Path(__file__).parent / "static" / "anubuddhi.css").read_text(encoding="utf-8")
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css).strip()
+    return f"<style>{css}</style>"
+
+
+# Re-emitted on every rerun: Streamlit drops elements a run does not render again,
+# so the stylesheet cannot be injected once per session
+st.markdown(_css_blob(), unsafe_allow_html=True)
+
+# Caps on append-only session logs; the oldest entries are dropped first
+_CHAT_HISTORY_LIMIT = 200
+_TERMINAL_LOG_LIMIT = 500
+
+# The live terminal is redrawn at most this often (seconds) or after this many new lines
+_TERMINAL_REFRESH_INTERVAL = 0.1
+_TERMINAL_REFRESH_LINES = 20
 
 # Initialize session state
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+    st.session_state.chat_history = deque(maxlen=_CHAT_HISTORY_LIMIT)
 if 'current_design' not in st.session_state:
     st.session_state.current_design = None
 if 'designer_agent' not in st.session_state:
@@ -572,7 +81,90 @@ if 'processing_mode' not in st.session_state:
     st.session_state.processing_mode = None
 if 'terminal_logs' not in st.session_state:
     # Global terminal logs for all system output
-    st.session_state.terminal_logs = []
+    st.session_state.terminal_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)
+
+
+# orjson parses search responses several times faster when installed; stdlib json otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Web fetches run on a small shared pool sized like the HTTP connection pool, which
+# bounds open sockets across all sessions and lets a caller give up on a stalled fetch
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-search")
+_SEARCH_DEADLINE = 10  # seconds for the whole fetch; requests' timeout is per socket read
+
+
+@st.cache_resource
+def _http_session():
+    """Keep-alive HTTP session shared by all searches, so repeat queries skip the TCP/TLS handshake."""
+    import atexit
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    atexit.register(session.close)
+    return session
+
+
+def _fetch_web_results(session, query: str) -> list:
+    """
+    Query the DuckDuckGo Instant Answer API for a normalized query over session.
+    Runs on a _SEARCH_EXECUTOR worker, which has no Streamlit script context, so
+    it must not call st.* or cached functions; network and JSON errors propagate.
+    """
+    from urllib.parse import quote
+    
+    # Try DuckDuckGo Instant Answer API first (cleaner, faster)
+    encoded_query = quote(query)
+    url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
+    
+    response = session.get(url, timeout=8)
+    if response.status_code != 200 or not response.text.strip():
+        raise ValueError(f"empty search response (HTTP {response.status_code})")
+    
+    data = _json_loads(response.content)
+    results = []
+    
+    # Extract abstract/definition
+    if data.get('Abstract'):
+        results.append({
+            'title': data.get('Heading', 'DuckDuckGo Result'),
+            'description': data.get('Abstract'),
+            'url': data.get('AbstractURL', 'https://duckduckgo.com')
+        })
+    
+    # Extract related topics
+    for topic in data.get('RelatedTopics', [])[:2]:
+        if isinstance(topic, dict) and topic.get('Text'):
+            results.append({
+                'title': topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else 'Related',
+                'description': topic.get('Text', ''),
+                'url': topic.get('FirstURL', 'https://duckduckgo.com')
+            })
+    
+    return results[:3]
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_web_results(query: str) -> list:
+    """
+    Cached search results for a normalized query. The cache lookup stays on the
+    script thread; only a miss sends the fetch to the pool, waiting at most
+    _SEARCH_DEADLINE. Errors and timeouts propagate, so st.cache_data never
+    stores a failure and the next call with the same query retries.
+    """
+    future = _SEARCH_EXECUTOR.submit(_fetch_web_results, _http_session(), query)
+    try:
+        return future.result(timeout=_SEARCH_DEADLINE)
+    except FuturesTimeoutError:
+        # Drops the fetch if it is still queued; one already running finishes on
+        # its worker and its result is discarded
+        future.cancel()
+        raise
 
 
 def web_search_wrapper(query: str) -> dict:
@@ -581,96 +173,74 @@ def web_search_wrapper(query: str) -> dict:
     Falls back to curated quantum optics knowledge if search fails.
     Returns dict with 'results' list and 'source' field ('web' or 'curated').
     """
+    # Queries differing only in case or spacing share one cache entry
+    normalized_query = re.sub(r"\s+", " ", query.strip().lower())
+    
     try:
-        import requests
-        from urllib.parse import quote
-        
-        # Try DuckDuckGo Instant Answer API first (cleaner, faster)
-        encoded_query = quote(query)
-        url = f"https://api.duckduckgo.com/?q={encoded_query}&format=json&no_html=1&skip_disambig=1"
-        
-        response = requests.get(url, timeout=8)
-        
-        if response.status_code == 200 and response.text.strip():
-            try:
-                data = response.json()
-                results = []
-                
-                # Extract abstract/definition
-                if data.get('Abstract'):
-                    results.append({
-                        'title': data.get('Heading', 'DuckDuckGo Result'),
-                        'description': data.get('Abstract'),
-                        'url': data.get('AbstractURL', 'https://duckduckgo.com')
-                    })
-                
-                # Extract related topics
-                for topic in data.get('RelatedTopics', [])[:2]:
-                    if isinstance(topic, dict) and topic.get('Text'):
-                        results.append({
-                            'title': topic.get('Text', '').split(' - ')[0] if ' - ' in topic.get('Text', '') else 'Related',
-                            'description': topic.get('Text', ''),
-                            'url': topic.get('FirstURL', 'https://duckduckgo.com')
-                        })
-                
-                # If we got real results, return them
-                if results:
-                    return {"results": results[:3], "source": "web"}
-            except (ValueError, KeyError) as json_error:
-                # JSON parsing failed, fall through to curated knowledge
-                pass
-        
-        # Fallback: return curated quantum optics knowledge
-        # (Don't print message here - let calling code handle it)
-        curated = _get_curated_quantum_knowledge(query)
-        curated['source'] = 'curated'
-        return curated
-        
+        results = _cached_web_results(normalized_query)
+        # If we got real results, return them
+        if results:
+            return {"results": results, "source": "web"}
+    except FuturesTimeoutError:
+        print(f"   ⚠️  Web search timed out after {_SEARCH_DEADLINE}s")
+    except ValueError:
+        # Empty response or JSON parsing failed, fall through to curated knowledge
+        pass
     except Exception as e:
-        # Only print error for non-JSON issues
-        if "Expecting value" not in str(e):
-            print(f"   ⚠️  Web search error: {e}")
-        curated = _get_curated_quantum_knowledge(query)
-        curated['source'] = 'curated'
-        return curated
+        print(f"   ⚠️  Web search error: {e}")
+    
+    # Fallback: return curated quantum optics knowledge
+    # (Don't print message here - let calling code handle it)
+    return {"results": list(_get_curated_quantum_knowledge(normalized_query)["results"]), "source": "curated"}
+
+
+# Curated experiments, in match priority order, for when web search fails
+_CURATED_KNOWLEDGE = {
+    'hong-ou-mandel': {
+        'title': 'Hong-Ou-Mandel (HOM) Effect',
+        'description': 'Two-photon quantum interference where indistinguishable photons incident on a 50:50 beam splitter always exit together in the same output port, creating a characteristic dip in coincidence counts. Requires SPDC source, delay matching, 50:50 BS, and coincidence detection.',
+        'url': 'https://en.wikipedia.org/wiki/Hong%E2%80%93Ou%E2%80%93Mandel_effect'
+    },
+    'bell': {
+        'title': 'Bell State Measurement',
+        'description': 'Measurement of maximally entangled two-qubit states |Φ±⟩ or |Ψ±⟩. Typically uses SPDC to generate entangled photon pairs, polarization analysis with wave plates and polarizers, and coincidence counting.',
+        'url': 'https://en.wikipedia.org/wiki/Bell_state'
+    },
+    'mach-zehnder': {
+        'title': 'Mach-Zehnder Interferometer',
+        'description': 'Two-path interferometer with two beam splitters and adjustable phase shift in one arm. Shows wave-particle duality and can demonstrate quantum erasure. Components: 2× beam splitters, 2× mirrors, phase shifter, detectors.',
+        'url': 'https://en.wikipedia.org/wiki/Mach%E2%80%93Zehnder_interferometer'
+    },
+    'double-slit': {
+        'title': 'Double-Slit Experiment',
+        'description': 'Fundamental quantum interference experiment showing wave-particle duality. Single photons create interference pattern on screen. Components: coherent source, double slit, detection screen or camera.',
+        'url': 'https://en.wikipedia.org/wiki/Double-slit_experiment'
+    },
+    'spdc': {
+        'title': 'Spontaneous Parametric Down-Conversion (SPDC)',
+        'description': 'Nonlinear optical process where pump photon splits into signal and idler photons in nonlinear crystal (BBO, KTP, PPLN). Energy and momentum conservation creates entangled pairs. Type-I: same polarization, Type-II: orthogonal polarizations.',
+        'url': 'https://en.wikipedia.org/wiki/Spontaneous_parametric_down-conversion'
+    }
+}
+
+# Every keyword (whole key and each hyphen-separated word) -> priority of its entry.
+# The lookahead makes the pattern report a match at every position, so one scan finds
+# each keyword occurrence, including ones nested inside longer keywords.
+_CURATED_PRIORITY = {word: i for i, key in enumerate(_CURATED_KNOWLEDGE)
+                     for word in [key, *key.split('-')]}
+_CURATED_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_CURATED_PRIORITY, key=len, reverse=True))) + '))'
+)
+_CURATED_ENTRIES = list(_CURATED_KNOWLEDGE.values())
 
 
+@functools.lru_cache(maxsize=128)
 def _get_curated_quantum_knowledge(query: str) -> dict:
     """Provide curated quantum optics experiment knowledge when web search fails."""
-    query_lower = query.lower()
-    
-    knowledge_base = {
-        'hong-ou-mandel': {
-            'title': 'Hong-Ou-Mandel (HOM) Effect',
-            'description': 'Two-photon quantum interference where indistinguishable photons incident on a 50:50 beam splitter always exit together in the same output port, creating a characteristic dip in coincidence counts. Requires SPDC source, delay matching, 50:50 BS, and coincidence detection.',
-            'url': 'https://en.wikipedia.org/wiki/Hong%E2%80%93Ou%E2%80%93Mandel_effect'
-        },
-        'bell': {
-            'title': 'Bell State Measurement',
-            'description': 'Measurement of maximally entangled two-qubit states |Φ±⟩ or |Ψ±⟩. Typically uses SPDC to generate entangled photon pairs, polarization analysis with wave plates and polarizers, and coincidence counting.',
-            'url': 'https://en.wikipedia.org/wiki/Bell_state'
-        },
-        'mach-zehnder': {
-            'title': 'Mach-Zehnder Interferometer',
-            'description': 'Two-path interferometer with two beam splitters and adjustable phase shift in one arm. Shows wave-particle duality and can demonstrate quantum erasure. Components: 2× beam splitters, 2× mirrors, phase shifter, detectors.',
-            'url': 'https://en.wikipedia.org/wiki/Mach%E2%80%93Zehnder_interferometer'
-        },
-        'double-slit': {
-            'title': 'Double-Slit Experiment',
-            'description': 'Fundamental quantum interference experiment showing wave-particle duality. Single photons create interference pattern on screen. Components: coherent source, double slit, detection screen or camera.',
-            'url': 'https://en.wikipedia.org/wiki/Double-slit_experiment'
-        },
-        'spdc': {
-            'title': 'Spontaneous Parametric Down-Conversion (SPDC)',
-            'description': 'Nonlinear optical process where pump photon splits into signal and idler photons in nonlinear crystal (BBO, KTP, PPLN). Energy and momentum conservation creates entangled pairs. Type-I: same polarization, Type-II: orthogonal polarizations.',
-            'url': 'https://en.wikipedia.org/wiki/Spontaneous_parametric_down-conversion'
-        }
-    }
-    
-    # Find matching knowledge
-    for key, info in knowledge_base.items():
-        if key in query_lower or any(word in query_lower for word in key.split('-')):
-            return {"results": [info]}
+    # Earliest entry with any keyword in the query wins, as in knowledge base order
+    hits = [_CURATED_PRIORITY[word] for word in _CURATED_RE.findall(query.lower())]
+    if hits:
+        return {"results": [_CURATED_ENTRIES[min(hits)]]}
     
     # Generic quantum optics info
     return {"results": [{
@@ -680,32 +250,45 @@ def _get_curated_quantum_knowledge(query: str) -> dict:
     }]}
 
 
+@st.cache_resource(show_spinner=False)
+def _get_designer_and_agent():
+    """Build the LLM designer and free-form simulation agent once per server process.
+    
+    Every session shares the returned pair, so the memory system, toolbox and
+    embedding models are loaded once instead of per browser tab.
+    """
+    from llm_designer import LLMDesigner
+    from agentic_quantum.llm import SimpleLLM
+    from freeform_simulation_agent import FreeFormSimulationAgent
+    
+    llm = SimpleLLM(model="anthropic/claude-sonnet-4.5")
+    
+    # Try to enable web search if available
+    try:
+        # Check if web search tool is available
+        web_search_fn = web_search_wrapper
+        designer = LLMDesigner(
+            llm_client=llm,
+            web_search_tool=web_search_fn
+        )
+        print("✅ Designer initialized with web search capability")
+    except Exception as e:
+        print(f"⚠️  Web search not available, initializing without it: {e}")
+        designer = LLMDesigner(llm_client=llm)
+    
+    # Initialize free-form simulation agent
+    return designer, FreeFormSimulationAgent(llm_client=llm)
+
+
 def initialize_designer():
     """Initialize the LLM-driven quantum designer with web search capability."""
     # Show initialization message
     with st.spinner("🧠 Initializing AI memory system (first time may take a moment)..."):
-        llm = SimpleLLM(model="anthropic/claude-sonnet-4.5")
-        
-        # Try to enable web search if available
-        try:
-            # Check if web search tool is available
-            web_search_fn = web_search_wrapper
-            st.session_state.designer = LLMDesigner(
-                llm_client=llm,
-                web_search_tool=web_search_fn
-            )
-            print("✅ Designer initialized with web search capability")
-        except Exception as e:
-            print(f"⚠️  Web search not available, initializing without it: {e}")
-            st.session_state.designer = LLMDesigner(llm_client=llm)
-        
-        # Initialize free-form simulation agent
-        st.session_state.freeform_agent = FreeFormSimulationAgent(llm_client=llm)
+        st.session_state.designer, st.session_state.freeform_agent = _get_designer_and_agent()
 
 
-def create_component_legend():
-    """Create a visual legend for optical components."""
-    return """
+# Static component legend markup
+_LEGEND_HTML = """
     <div style="background: white; padding: 15px; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-top: 20px;">
         <h4 style="margin-top: 0; color: #495057;">Component Legend</h4>
         <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 10px;">
@@ -754,18 +337,65 @@ def create_component_legend():
     """
 
 
+def create_component_legend():
+    """Create a visual legend for optical components."""
+    return _LEGEND_HTML
+
+
+# Two-mode single-photon Fock tag in a source description, e.g. "|1,0⟩"
+_FOCK_TAG_RE = re.compile(r"\|([01]),([01])")
+
+# Optical table diagram fragments: (box color, icon) per component type, the
+# per-component box and connecting arrow templates, and the fixed header/footer
+_DIAGRAM_COMPONENT_STYLE = {
+    'source': ('#ff6b6b', '🔴'),
+    'beamsplitter': ('#4dabf7', '🔷'),
+    'phase': ('#a5d8ff', '🔵'),
+    'detector': ('#51cf66', '🟢'),
+}
+_DIAGRAM_DEFAULT_STYLE = ('#adb5bd', '⚪')
+_DIAGRAM_BOX_HTML = '''
+            <div style="display: inline-block; width: {width}%; vertical-align: middle; text-align: center;">
+                <div style="background: {color}; color: white; padding: 20px 10px; border-radius: 10px; font-weight: bold; margin: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.2);">
+                    <div style="font-size: 24px;">{icon}</div>
+                    <div style="font-size: 12px; margin-top: 5px;">{label}</div>
+                </div>
+            </div>'''
+_DIAGRAM_ARROW_HTML = '''
+            <div style="display: inline-block; width: {width}%; vertical-align: middle; text-align: center;">
+                <div style="color: #ffd43b; font-size: 30px; font-weight: bold;">→</div>
+            </div>'''
+_DIAGRAM_HEADER_HTML = '''
+    <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); padding: 30px; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+        <h3 style="text-align: center; color: #2c3e50; margin-bottom: 20px; font-size: 20px;">🔬 Optical Table Setup</h3>
+        <div style="background: white; padding: 20px; border-radius: 10px; min-height: 200px; position: relative;">
+'''
+_DIAGRAM_FOOTER_HTML = '''
+        </div>
+        <div style="margin-top: 15px; padding: 15px; background: rgba(255,255,255,0.9); border-radius: 10px; font-size: 13px;">
+            <strong>📊 Optical Path:</strong> Photons flow left to right through each component sequentially
+        </div>
+    </div>
+'''
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
 def create_optical_table_diagram(experiment_dict):
-    """Generate professional canvas-based optical table diagram with proper physics layout."""
+    """Generate professional canvas-based optical table diagram with proper physics layout.
+    
+    Cached on the experiment's contents, so an unchanged design reuses its HTML across reruns.
+    """
     
     # Parse experiment steps to extract components
     components = []
     for step in experiment_dict.get('steps', []):
-        step_type = step.get('step_type')
+        step_type = step.get('step_type') or ''
         desc = step.get('description', '')
         params = step.get('parameters', {})
         
         if 'Fock state' in desc or step_type == 'initialization':
-            photon_pattern = '|1,0⟩' if '|1,0' in desc else '|0,0⟩'
+            m = _FOCK_TAG_RE.search(desc)
+            photon_pattern = f"|{m.group(1)},{m.group(2)}⟩" if m else '|0,0⟩'
             components.append({'type': 'source', 'label': f'Source {photon_pattern}'})
         elif 'Beam splitter' in desc or step_type == 'beam_splitter':
             t = params.get('transmittance', 0.5)
@@ -776,173 +406,141 @@ def create_optical_table_diagram(experiment_dict):
         elif 'measurement' in step_type or 'Measurement' in desc:
             components.append({'type': 'detector', 'label': 'Detector'})
     
-    # Create a clean HTML/CSS based diagram
-    diagram_html = f'''
-    <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); padding: 30px; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-        <h3 style="text-align: center; color: #2c3e50; margin-bottom: 20px; font-size: 20px;">🔬 Optical Table Setup</h3>
-        <div style="background: white; padding: 20px; border-radius: 10px; min-height: 200px; position: relative;">
-'''
+    # Create a clean HTML/CSS based diagram; fragments are collected and joined once
+    parts = [_DIAGRAM_HEADER_HTML]
     
     # Draw optical path horizontally with proper spacing
     if components:
         num_comps = len(components)
-        for i, comp in enumerate(components):
-            left_pos = 10 + (i * 80 / num_comps)
-            
-            # Component box
-            if comp['type'] == 'source':
-                color = '#ff6b6b'
-                icon = '🔴'
-            elif comp['type'] == 'beamsplitter':
-                color = '#4dabf7'
-                icon = '🔷'
-            elif comp['type'] == 'phase':
-                color = '#a5d8ff'
-                icon = '🔵'
-            elif comp['type'] == 'detector':
-                color = '#51cf66'
-                icon = '🟢'
-            else:
-                color = '#adb5bd'
-                icon = '⚪'
-            
-            diagram_html += f'''
-            <div style="display: inline-block; width: {70/num_comps}%; vertical-align: middle; text-align: center;">
-                <div style="background: {color}; color: white; padding: 20px 10px; border-radius: 10px; font-weight: bold; margin: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.2);">
-                    <div style="font-size: 24px;">{icon}</div>
-                    <div style="font-size: 12px; margin-top: 5px;">{comp['label']}</div>
-                </div>
-            </div>'''
-            
+        box_width = 70 / num_comps
+        arrow = _DIAGRAM_ARROW_HTML.format(width=25 / num_comps)
+        for comp in components:
+            color, icon = _DIAGRAM_COMPONENT_STYLE.get(comp['type'], _DIAGRAM_DEFAULT_STYLE)
+            parts.append(_DIAGRAM_BOX_HTML.format(width=box_width, color=color, icon=icon, label=comp['label']))
             # Draw arrow between components
-            if i < num_comps - 1:
-                diagram_html += f'''
-            <div style="display: inline-block; width: {25/num_comps}%; vertical-align: middle; text-align: center;">
-                <div style="color: #ffd43b; font-size: 30px; font-weight: bold;">→</div>
-            </div>'''
+            parts.append(arrow)
+        parts.pop()
     
-    diagram_html += '''
-        </div>
-        <div style="margin-top: 15px; padding: 15px; background: rgba(255,255,255,0.9); border-radius: 10px; font-size: 13px;">
-            <strong>📊 Optical Path:</strong> Photons flow left to right through each component sequentially
-        </div>
-    </div>
-'''
+    parts.append(_DIAGRAM_FOOTER_HTML)
     
-    return diagram_html
+    return "".join(parts)
 
 
-def simulate_and_validate(experiment_dict):
-    """Simulate the designed experiment and validate results."""
+def _simulate_design(experiment_dict):
+    """
+    Fock-space simulation behind simulate_and_validate.
     
-    status_placeholder = st.empty()
+    Returns None when the design has no Fock input state.
+    """
+    # Quantum primitives (states & operations) used by the simulator
+    from agentic_quantum.quantum import BeamSplitter, PhaseShift, interferometer_output_state
+    
+    # Start with initial state
+    initial_state_info = None
+    for step in experiment_dict['steps']:
+        if step['step_type'] == 'state':
+            initial_state_info = step
+            break
+    
+    # Create initial state
+    if initial_state_info and 'Fock' in initial_state_info['description']:
+        photon_nums = initial_state_info['component']['metadata']['photon_numbers']
+        # Beam splitters and phase shifts conserve the total photon number N, so
+        # a per-mode cutoff of N + 1 holds every reachable state exactly
+        cutoff = max(sum(photon_nums) + 1, 2)
+        
+        # Collect the operations into one mode-space matrix, then apply the whole
+        # network to the input Fock state at once
+        network = np.eye(len(photon_nums), dtype=complex)
+        for step in experiment_dict['steps']:
+            if step['step_type'] == 'operation':
+                comp = step['component']
+                if comp['type'] == 'beam_splitter':
+                    modes = comp['target_modes']
+                    bs = BeamSplitter(
+                        mode1=modes[0],
+                        mode2=modes[1],
+                        transmittance=comp['parameters']['transmittance'],
+                        phase=comp['parameters']['phase']
+                    )
+                    network = bs.mode_matrix(len(photon_nums)) @ network
+                
+                elif comp['type'] == 'phase_shift':
+                    mode = comp['target_modes'][0]
+                    ps = PhaseShift(
+                        mode=mode,
+                        phase=comp['parameters']['phase']
+                    )
+                    network = ps.mode_matrix(len(photon_nums)) @ network
+        state = interferometer_output_state(network, photon_nums, cutoff)
+        
+        # Analyze final state
+        vec = np.array(state.full()).flatten()
+        
+        # Calculate metrics
+        purity = np.abs(np.vdot(vec, vec))
+        non_zero_components = np.sum(np.abs(vec) > 0.001)
+        
+        # Find dominant components
+        indices = np.argsort(-np.abs(vec))[:5]
+        components = []
+        for idx in indices:
+            if np.abs(vec[idx]) > 0.001:
+                mode1 = idx // cutoff
+                mode2 = idx % cutoff
+                prob = np.abs(vec[idx])**2
+                components.append((mode1, mode2, prob))
+        
+        # Determine if it's entangled
+        is_vacuum = (non_zero_components == 1 and np.abs(vec[0]) > 0.99)
+        is_entangled = non_zero_components > 1 and purity > 0.99
+        
+        # Bell state fidelity (rough estimate)
+        bell_fidelity = 0.0
+        if not is_vacuum and len(components) >= 2:
+            # Check if it looks like a Bell state pattern
+            bell_fidelity = min(components[0][2] + components[1][2], 1.0)
+        
+        return {
+            'success': True,
+            'purity': float(purity),
+            'non_zero_components': int(non_zero_components),
+            'is_vacuum': is_vacuum,
+            'is_entangled': is_entangled,
+            'bell_fidelity': bell_fidelity,
+            'components': components,
+            'is_correct': not is_vacuum and (is_entangled or bell_fidelity > 0.5)
+        }
     
-    # Simulation steps with progress
-    steps = [
-        ("🔄 Initializing quantum simulation...", 0.2),
-        ("⚛️  Preparing initial quantum state...", 0.4),
-        ("🔧 Applying quantum operations...", 0.6),
-        ("📊 Calculating state properties...", 0.8),
-        ("✅ Validating design...", 1.0)
-    ]
+    return None
+
+
+def simulate_and_validate(experiment_dict):
+    """
+    Simulate the designed experiment and validate results.
     
-    progress_bar = st.progress(0)
+    Not called by the app at present: the Run Simulation button goes through
+    run_simulation_on_design and the designer's own simulation agent.
+    """
     
-    for step_text, progress in steps:
-        status_placeholder.info(step_text)
-        progress_bar.progress(progress)
-        time.sleep(0.3)  # Simulate processing
+    progress_bar = st.progress(0, text="🔧 Applying quantum operations...")
     
     # Actually simulate
     try:
-        # Start with initial state
-        initial_state_info = None
-        for step in experiment_dict['steps']:
-            if step['step_type'] == 'state':
-                initial_state_info = step
-                break
-        
-        # Create initial state
-        if initial_state_info and 'Fock' in initial_state_info['description']:
-            photon_nums = initial_state_info['component']['metadata']['photon_numbers']
-            state = FockState(photon_numbers=photon_nums).to_qobj()
-            
-            # Apply operations
-            for step in experiment_dict['steps']:
-                if step['step_type'] == 'operation':
-                    comp = step['component']
-                    if comp['type'] == 'beam_splitter':
-                        modes = comp['target_modes']
-                        bs = BeamSplitter(
-                            mode1=modes[0],
-                            mode2=modes[1],
-                            transmittance=comp['parameters']['transmittance'],
-                            phase=comp['parameters']['phase']
-                        )
-                        bs_op = bs.get_operator([50, 50])
-                        state = bs_op * state
-                    
-                    elif comp['type'] == 'phase_shift':
-                        mode = comp['target_modes'][0]
-                        ps = PhaseShift(
-                            mode=mode,
-                            phase=comp['parameters']['phase']
-                        )
-                        ps_op = ps.get_operator([50, 50])
-                        state = ps_op * state
-            
-            # Analyze final state
-            vec = np.array(state.full()).flatten()
-            
-            # Calculate metrics
-            purity = np.abs(np.vdot(vec, vec))
-            non_zero_components = np.sum(np.abs(vec) > 0.001)
-            
-            # Find dominant components
-            indices = np.argsort(-np.abs(vec))[:5]
-            components = []
-            for idx in indices:
-                if np.abs(vec[idx]) > 0.001:
-                    mode1 = idx // 50
-                    mode2 = idx % 50
-                    prob = np.abs(vec[idx])**2
-                    components.append((mode1, mode2, prob))
-            
-            # Determine if it's entangled
-            is_vacuum = (non_zero_components == 1 and np.abs(vec[0]) > 0.99)
-            is_entangled = non_zero_components > 1 and purity > 0.99
-            
-            # Bell state fidelity (rough estimate)
-            bell_fidelity = 0.0
-            if not is_vacuum and len(components) >= 2:
-                # Check if it looks like a Bell state pattern
-                bell_fidelity = min(components[0][2] + components[1][2], 1.0)
-            
-            status_placeholder.empty()
-            progress_bar.empty()
-            
-            return {
-                'success': True,
-                'purity': float(purity),
-                'non_zero_components': int(non_zero_components),
-                'is_vacuum': is_vacuum,
-                'is_entangled': is_entangled,
-                'bell_fidelity': bell_fidelity,
-                'components': components,
-                'is_correct': not is_vacuum and (is_entangled or bell_fidelity > 0.5)
-            }
-    
+        result = _simulate_design(experiment_dict)
+        progress_bar.progress(100, text="✅ Validating design...")
     except Exception as e:
-        status_placeholder.empty()
         progress_bar.empty()
         return {
             'success': False,
             'error': str(e)
         }
     
-    status_placeholder.empty()
     progress_bar.empty()
     
+    if result is not None:
+        return result
+    
     return {
         'success': False,
         'error': 'Unknown simulation error'
@@ -988,16 +586,17 @@ def design_experiment(user_query, previous_design=None, conversation_history=Non
     if previous_design:
         # Refinement mode: include previous design context with numbered components
         components = previous_design.get('experiment', {}).get('steps', [])
-        component_list = ""
+        parts = []
         for i, comp in enumerate(components, 1):
             comp_name = comp.get('description', comp.get('type', 'Component'))
             comp_type = comp.get('type', 'unknown')
             pos = comp.get('position', (0, 0))
             params = comp.get('parameters', {})
-            component_list += f"{i}. **{comp_name}** (type: {comp_type})\n"
-            component_list += f"   Position: ({pos[0]:.1f}, {pos[1]:.1f})\n"
+            parts.append(f"{i}. **{comp_name}** (type: {comp_type})\n"
+                         f"   Position: ({pos[0]:.1f}, {pos[1]:.1f})\n")
             if params:
-                component_list += f"   Parameters: {json.dumps(params)}\n"
+                parts.append(f"   Parameters: {json.dumps(params)}\n")
+        component_list = "".join(parts)
         
         enhanced_query = f"""REFINE THE FOLLOWING DESIGN:
 
@@ -1108,6 +707,35 @@ Please modify the design according to the user's request while preserving the ov
     return design_result
 
 
+def _optical_setup_for(design_result):
+    """
+    The OpticalSetup behind a design result.
+    
+    Fresh designs carry the original object; retrieved ones are rebuilt from
+    their fields once and the rebuilt object is stored back on the result, so
+    repeat simulations of the same design reuse it.
+    """
+    optical_setup = design_result.get('optical_setup_object')
+    if optical_setup is None:
+        # Reconstruct from design_result
+        from llm_designer import OpticalSetup
+        optical_setup = OpticalSetup(
+            title=design_result.get('title', 'Untitled'),
+            description=design_result.get('description', ''),
+            components=design_result.get('components_sent_to_renderer', []),
+            beam_path=design_result.get('experiment', {}).get('beam_path', []),
+            physics_explanation=design_result.get('physics_explanation', ''),
+            expected_outcome=design_result.get('expected_outcome', ''),
+            component_justifications=design_result.get('component_justifications', {}),
+            raw_llm_response=design_result.get('raw_llm_response', ''),
+            parsed_design_json=design_result.get('parsed_design', {}),
+            web_search_used=design_result.get('web_search_used', False),
+            web_search_context=design_result.get('web_search_context', '')
+        )
+        design_result['optical_setup_object'] = optical_setup
+    return optical_setup
+
+
 def run_simulation_on_design(design_result):
     """
     Run quantum simulation on an existing design.
@@ -1127,29 +755,10 @@ def run_simulation_on_design(design_result):
     
     designer = st.session_state.designer
     
-    # Logs are already captured by global terminal_print function
+    # Logs are already captured by the session terminal (see _terminal_capture)
     
     try:
-        # We need to reconstruct the OpticalSetup from the design result
-        # or better yet, store the original OpticalSetup object
-        if 'optical_setup_object' in design_result:
-            optical_setup = design_result['optical_setup_object']
-        else:
-            # Reconstruct from design_result
-            from llm_designer import OpticalSetup
-            optical_setup = OpticalSetup(
-                title=design_result.get('title', 'Untitled'),
-                description=design_result.get('description', ''),
-                components=design_result.get('components_sent_to_renderer', []),
-                beam_path=design_result.get('experiment', {}).get('beam_path', []),
-                physics_explanation=design_result.get('physics_explanation', ''),
-                expected_outcome=design_result.get('expected_outcome', ''),
-                component_justifications=design_result.get('component_justifications', {}),
-                raw_llm_response=design_result.get('raw_llm_response', ''),
-                parsed_design_json=design_result.get('parsed_design', {}),
-                web_search_used=design_result.get('web_search_used', False),
-                web_search_context=design_result.get('web_search_context', '')
-            )
+        optical_setup = _optical_setup_for(design_result)
         
         # Run simulation
         result = designer.run_simulation(optical_setup)
@@ -1203,36 +812,100 @@ def run_freeform_simulation(design_result):
         }
 
 
-def main():
-    """Main app interface - clean and beautiful."""
+class _SessionStdout:
+    """
+    sys.stdout stand-in that also feeds the terminal of the session writing to it.
+    
+    The sink is looked up in a ContextVar, so only the script thread that set it
+    (see _terminal_capture) is captured; other sessions, worker threads and
+    library output elsewhere go straight to the real stream.
+    """
+    
+    def __init__(self, stream, sink_var):
+        self._stream = stream
+        self._sink_var = sink_var
+    
+    def write(self, text):
+        sink = self._sink_var.get()
+        if sink is not None:
+            sink.write(text)
+        return self._stream.write(text)
     
-    # Setup global print capture for terminal display
-    import builtins
-    if 'original_print' not in st.session_state:
-        st.session_state.original_print = builtins.print
-    
-    def terminal_print(*args, **kwargs):
-        """Capture all print statements to terminal logs."""
-        message = ' '.join(str(arg) for arg in args)
-        if 'terminal_logs' not in st.session_state:
-            st.session_state.terminal_logs = []
-        st.session_state.terminal_logs.append(message)
-        # Also print to original output
-        st.session_state.original_print(*args, **kwargs)
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@st.cache_resource
+def _terminal_sink_var():
+    """Install the stdout router once per server process; returns the per-session sink variable."""
+    sink_var = contextvars.ContextVar("terminal_sink", default=None)
+    sys.stdout = _SessionStdout(sys.stdout, sink_var)
+    return sink_var
+
+
+class _TerminalWriter:
+    """
+    Collects one session's stdout into terminal_logs, a line at a time.
+    
+    Redrawing joins every retained line, so the placeholder is refreshed at most
+    every _TERMINAL_REFRESH_INTERVAL seconds or _TERMINAL_REFRESH_LINES lines,
+    plus once when the run finishes.
+    """
+    
+    def __init__(self, session_state):
+        self._state = session_state
+        self._partial = ""
+        self._pending = 0
+        self._last_refresh = time.monotonic()
+    
+    def write(self, text):
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if not lines:
+            return
+        if 'terminal_logs' not in self._state:
+            self._state.terminal_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)
+        self._state.terminal_logs.extend(lines)
+        
+        self._pending += len(lines)
+        if (self._pending >= _TERMINAL_REFRESH_LINES
+                or time.monotonic() - self._last_refresh > _TERMINAL_REFRESH_INTERVAL):
+            self.flush()
+    
+    def flush(self):
+        """Redraw the terminal placeholder with any lines not yet shown."""
+        if not self._pending:
+            return
+        self._pending = 0
+        self._last_refresh = time.monotonic()
         
         # Force update terminal display if placeholder exists
-        if 'terminal_placeholder' in st.session_state and st.session_state.terminal_placeholder is not None:
+        placeholder = self._state.get('terminal_placeholder')
+        if placeholder is not None:
             try:
-                with st.session_state.terminal_placeholder.container():
-                    logs = st.session_state.get('terminal_logs', [])
-                    if logs:
-                        terminal_text = "\n".join(logs)
-                        st.code(terminal_text, language="bash")
-            except:
+                with placeholder.container():
+                    # terminal_logs already keeps only the last _TERMINAL_LOG_LIMIT lines
+                    st.code("\n".join(self._state.terminal_logs), language="bash")
+            except Exception:
                 pass  # Placeholder might not be active anymore
-    
-    # Replace print globally
-    builtins.print = terminal_print
+
+
+@contextlib.contextmanager
+def _terminal_capture():
+    """Route this script run's print output to the session terminal."""
+    sink_var = _terminal_sink_var()
+    writer = _TerminalWriter(st.session_state)
+    token = sink_var.set(writer)
+    try:
+        yield
+        # Show lines still held back by the refresh throttle
+        writer.flush()
+    finally:
+        sink_var.reset(token)
+
+
+def main():
+    """Main app interface - clean and beautiful."""
     
     # Sidebar with system status
     with st.sidebar:
@@ -1370,7 +1043,7 @@ def main():
             st.markdown("#### 🖥️ System Terminal")
         with col_term_clear:
             if st.button("🗑️ Clear", key="clear_terminal", type="secondary"):
-                st.session_state.terminal_logs = []
+                st.session_state.terminal_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)
                 st.rerun()
         
         # Use placeholder for dynamic updates
@@ -1383,7 +1056,7 @@ def main():
             with st.session_state.terminal_placeholder.container():
                 logs = st.session_state.get('terminal_logs', [])
                 if logs:
-                    # Display ALL logs (no limit), newest at bottom
+                    # Display the retained logs (last _TERMINAL_LOG_LIMIT), newest at bottom
                     terminal_text = "\n".join(logs)
                     st.code(terminal_text, language="bash")
                 else:
@@ -1413,25 +1086,7 @@ def main():
             st.session_state.pending_query = chat_text
             st.session_state.is_processing = True
             st.session_state.processing_mode = 'pending'
-            st.session_state.processing_logs = []  # Initialize logs immediately
-            
-            # Set up print interception immediately
-            import builtins
-            if not hasattr(st.session_state, 'original_print'):
-                st.session_state.original_print = builtins.print
-            
-            def log_print(*args, **kwargs):
-                # Call original print for terminal
-                if hasattr(st.session_state, 'original_print'):
-                    st.session_state.original_print(*args, **kwargs)
-                # Add to logs (force add to session state)
-                message = ' '.join(str(arg) for arg in args)
-                if message.strip():
-                    if 'processing_logs' not in st.session_state:
-                        st.session_state.processing_logs = []
-                    st.session_state.processing_logs.append(message)
-            
-            builtins.print = log_print
+            st.session_state.processing_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)  # Initialize logs immediately
             
             # Rerun immediately to show user message cleanly
             st.rerun()
@@ -1467,7 +1122,7 @@ def main():
             
             # Ensure logging is set up
             if 'processing_logs' not in st.session_state:
-                st.session_state.processing_logs = []
+                st.session_state.processing_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)
             
             # Add initial log
             if not st.session_state.processing_logs:
@@ -1504,12 +1159,7 @@ def main():
                     st.session_state.pending_query = None
                     st.session_state.is_processing = False
                     st.session_state.processing_mode = None
-                    st.session_state.processing_logs = []  # Clear logs
-                    
-                    # Restore original print
-                    import builtins
-                    if hasattr(st.session_state, 'original_print'):
-                        builtins.print = st.session_state.original_print
+                    st.session_state.processing_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)  # Clear logs
                     
                     st.rerun()
                     
@@ -1589,12 +1239,7 @@ def main():
                         st.session_state.pending_query = None
                         st.session_state.is_processing = False
                         st.session_state.processing_mode = None
-                        st.session_state.processing_logs = []  # Clear logs
-                        
-                        # Restore original print
-                        import builtins
-                        if hasattr(st.session_state, 'original_print'):
-                            builtins.print = st.session_state.original_print
+                        st.session_state.processing_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)  # Clear logs
                         
                         st.rerun()
                     
@@ -1608,11 +1253,7 @@ def main():
                         st.stop()
                     
             except Exception as e:
-                # Restore original print on error
-                import builtins
-                if hasattr(st.session_state, 'original_print'):
-                    builtins.print = st.session_state.original_print
-                st.session_state.processing_logs = []
+                st.session_state.processing_logs = deque(maxlen=_TERMINAL_LOG_LIMIT)
                 st.error(f"Error: {e}")
     
     # RIGHT: Design visualization and details
@@ -1737,6 +1378,8 @@ def main():
             # Optical table diagram (fills right half)
             st.markdown("### 🔬 Quantum Optical Setup")
             try:
+                import matplotlib.pyplot as plt
+                from simple_optical_table import create_optical_table_figure
                 fig = create_optical_table_figure(experiment, figsize=(14, 10))
                 st.pyplot(fig, use_container_width=True)
                 plt.close(fig)
@@ -1850,6 +1493,8 @@ def main():
                                 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                                     # 1. Optical table diagram
                                     try:
+                                        import matplotlib.pyplot as plt
+                                        from simple_optical_table import create_optical_table_figure
                                         fig_temp = create_optical_table_figure(experiment, figsize=(14, 10))
                                         img_buf = io.BytesIO()
                                         fig_temp.savefig(img_buf, format='png', dpi=300, bbox_inches='tight')
@@ -2159,6 +1804,8 @@ def main():
                                 experiment = result.get('experiment', {})
                                 if experiment:
                                     # Generate high-resolution diagram for download
+                                    import matplotlib.pyplot as plt
+                                    from simple_optical_table import create_optical_table_figure
                                     fig = create_optical_table_figure(experiment, figsize=(16, 12))
                                     
                                     # Save to bytes buffer
@@ -3228,4 +2875,5 @@ This report combines the simulation results with AI-powered analysis to help you
 
 
 if __name__ == "__main__":
-    main()
+    with _terminal_capture():
+        main()
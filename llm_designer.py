@@ -7,6 +7,7 @@ import json
 import re
 import sys
 import os
+import threading
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
@@ -44,6 +45,28 @@ except ImportError as e:
     print(f"⚠️  Simulation agent not available: {e}")
 
 
+# Strong design modification indicators, shared by the local and fallback routing
+_DESIGN_KEYWORDS = [
+    'add', 'remove', 'replace', 'change', 'modify', 'adjust', 'move',
+    'increase', 'decrease', 'swap', 'switch', 'insert', 'delete',
+    'make it', 'convert to', 'turn it into', 'transform'
+]
+
+# Unambiguous routing cues, decided locally before asking the LLM. A message that
+# opens with a design verb is DESIGN; one that opens as a question and names no
+# edit is CHAT; any other edit aimed at a numbered component is DESIGN. Single
+# keywords match any inflection ("increasing", "swapped"): a spurious edit match
+# only defers to the LLM, a missed one answers a design request as chat.
+_ROUTE_DESIGN_RE = re.compile(r"^\s*(?:design|build|create|generate|set\s*up)\b", re.IGNORECASE)
+_ROUTE_CHAT_RE = re.compile(r"^\s*(?:what|how|why|explain|tell me|describe|where)\b", re.IGNORECASE)
+_ROUTE_EDIT_RE = re.compile(
+    r"\b(?:" + "|".join(
+        r"\s+".join(keyword.split()) + r"\b" if " " in keyword else keyword.rstrip("ey") + r"\w*"
+        for keyword in _DESIGN_KEYWORDS) + ")",
+    re.IGNORECASE)
+_ROUTE_COMPONENT_RE = re.compile(r"(?:\bcomponents?\s*|#)\d+\b", re.IGNORECASE)
+
+
 @dataclass
 class OpticalSetup:
     """The LLM's complete optical table design."""
@@ -133,6 +156,26 @@ class LLMDesigner:
                 self.simulator = None
         else:
             self.simulator = None
+        
+        # Per-design scratch state lives in thread-local storage: one designer may be
+        # shared by several app sessions, each designing on its own thread
+        self._design_scratch = threading.local()
+    
+    @property
+    def _last_web_context(self) -> str:
+        return getattr(self._design_scratch, 'web_context', "")
+    
+    @_last_web_context.setter
+    def _last_web_context(self, value: str):
+        self._design_scratch.web_context = value
+    
+    @property
+    def _last_web_source(self) -> Optional[str]:
+        return getattr(self._design_scratch, 'web_source', None)
+    
+    @_last_web_source.setter
+    def _last_web_source(self, value: Optional[str]):
+        self._design_scratch.web_source = value
     
     def route_user_message(self, query: str, current_design: Optional[Dict] = None) -> tuple[str, str]:
         """
@@ -142,6 +185,11 @@ class LLMDesigner:
             (mode, reason) where mode is 'chat' or 'design'
         """
         
+        # Obvious cases need no LLM round-trip
+        fast = self._fast_route(query)
+        if fast:
+            return fast
+        
         # Build routing prompt
         design_status = "A design currently exists." if current_design else "No design exists yet."
         design_info = ""
@@ -196,17 +244,22 @@ Respond with ONLY ONE WORD: either "CHAT" or "DESIGN" """
             print(f"⚠️  LLM routing failed: {e}, using fallback")
             return self._fallback_routing(query, current_design)
     
+    def _fast_route(self, query: str) -> Optional[tuple[str, str]]:
+        """Local regex routing for unambiguous messages; None defers to the LLM."""
+        if _ROUTE_DESIGN_RE.match(query):
+            return ('design', 'Design request detected locally')
+        has_edit = _ROUTE_EDIT_RE.search(query) is not None
+        if _ROUTE_CHAT_RE.match(query):
+            # "what if we move ..." could go either way
+            return None if has_edit else ('chat', 'Question detected locally')
+        if has_edit and _ROUTE_COMPONENT_RE.search(query):
+            return ('design', 'Numbered component edit detected locally')
+        return None
+    
     def _fallback_routing(self, query: str, current_design: Optional[Dict] = None) -> tuple[str, str]:
         """Simple keyword-based fallback routing if LLM fails."""
         query_lower = query.lower()
         
-        # Strong design modification indicators
-        design_keywords = [
-            'add', 'remove', 'replace', 'change', 'modify', 'adjust', 'move',
-            'increase', 'decrease', 'swap', 'switch', 'insert', 'delete',
-            'make it', 'convert to', 'turn it into', 'transform'
-        ]
-        
         # Strong chat/question indicators  
         chat_keywords = [
             'what is', 'why', 'how does', 'how do', 'how can', 'explain', 'tell me',
@@ -222,7 +275,7 @@ Respond with ONLY ONE WORD: either "CHAT" or "DESIGN" """
                 return ('chat', f'Question keyword detected: "{keyword}"')
         
         # Check for design modification intent
-        for keyword in design_keywords:
+        for keyword in _DESIGN_KEYWORDS:
             if keyword in query_lower:
                 return ('design', f'Design keyword detected: "{keyword}"')
         
@@ -259,12 +312,13 @@ Respond with ONLY ONE WORD: either "CHAT" or "DESIGN" """
             components = current_design.get('experiment', {}).get('steps', [])
             component_list = ""
             if components:
-                component_list = "\n**Component List (by number):**\n"
+                parts = ["\n**Component List (by number):**\n"]
                 for i, comp in enumerate(components, 1):
                     comp_name = comp.get('description', comp.get('type', 'Component'))
                     comp_type = comp.get('type', 'unknown')
                     pos = comp.get('position', (0, 0))
-                    component_list += f"{i}. {comp_name} ({comp_type}) at position ({pos[0]:.1f}, {pos[1]:.1f})\n"
+                    parts.append(f"{i}. {comp_name} ({comp_type}) at position ({pos[0]:.1f}, {pos[1]:.1f})\n")
+                component_list = "".join(parts)
             
             design_context = f"""
 **Current Design Context:**
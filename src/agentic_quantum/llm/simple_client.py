@@ -4,6 +4,7 @@ Simple LLM client for OpenRouter API integration.
 
 import os
 import logging
+import threading
 from typing import Optional, List, Dict, Any
 import requests
 from dotenv import load_dotenv
@@ -32,12 +33,22 @@ class SimpleLLM:
         self.model = model
         self.base_url = base_url
         
-        # Track token usage from last API call
-        self.last_usage = {}
+        # Track token usage from last API call, per thread: one client may be shared
+        # by several app sessions, each calling predict on its own thread
+        self._usage = threading.local()
         
         if not self.api_key:
             logger.warning("No API key provided for LLM")
     
+    @property
+    def last_usage(self) -> Dict[str, Any]:
+        """Token usage and cost of this thread's last API call ({} if none)."""
+        return getattr(self._usage, 'value', {})
+    
+    @last_usage.setter
+    def last_usage(self, value: Dict[str, Any]):
+        self._usage.value = value
+    
     async def apredict(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         Async predict method for compatibility.
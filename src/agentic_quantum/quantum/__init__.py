@@ -16,7 +16,8 @@ from .operations import (
     PhaseShift,
     Displacement,
     Squeezing,
-    Loss
+    Loss,
+    interferometer_output_state
 )
 
 from .measurements import (
@@ -58,6 +59,7 @@ __all__ = [
     "Displacement",
     "Squeezing",
     "Loss",
+    "interferometer_output_state",
     
     # Measurements
     "Measurement",
@@ -2,15 +2,147 @@
 Quantum operations for quantum experiment design.
 """
 
+from functools import lru_cache
+
 import numpy as np
 from typing import List, Dict, Any, Optional, Union
 from abc import ABC, abstractmethod
 from enum import Enum
 import qutip as qt
+from scipy.linalg import eigh_tridiagonal
 
 from .states import QuantumState
 
 
+def _beam_splitter_block(d1: int, d2: int, r: complex, n: int):
+    """
+    Block of exp(r a1†a2 - r* a1 a2†) on the total-photon sector n.
+    
+    The sector spans |k, n-k> for k = k_min ... k_min + m - 1; returns
+    (k_min, block). Its generator is tridiagonal with off-diagonals
+    r*sqrt((k+1)(n-k)); the diagonal gauge (i r/|r|)^k makes it |r| times a
+    real symmetric tridiagonal matrix, exponentiated with eigh_tridiagonal.
+    """
+    k_min = max(0, n - d2 + 1)
+    m = min(n, d1 - 1) - k_min + 1
+    
+    # a1†a2 |k, l> = sqrt((k+1) l) |k+1, l-1>
+    k = np.arange(k_min, k_min + m - 1)
+    lam, V = eigh_tridiagonal(np.zeros(m), abs(r) * np.sqrt((k + 1) * (n - k)))
+    gauge = (1j * r / abs(r) if r else 1.0) ** np.arange(m)
+    block = (gauge[:, None] * V * np.exp(-1j * lam)) @ (V.T * gauge.conj())
+    return k_min, block
+
+
+def _sector_indices(d2: int, n: int, k_min: int, m: int) -> np.ndarray:
+    """Flat indices n1*d2 + n2 of the sector states |k, n-k>, k = k_min ... k_min + m - 1."""
+    k = np.arange(k_min, k_min + m)
+    return k * d2 + (n - k)
+
+
+def _beam_splitter_unitary(d1: int, d2: int, r: complex) -> np.ndarray:
+    """
+    Dense exp(r a1†a2 - r* a1 a2†) on two modes truncated at d1 and d2.
+    
+    The generator conserves n1 + n2, so the unitary is block diagonal over
+    total-photon sectors, each built by _beam_splitter_block instead of one
+    dense expm over all d1*d2 basis states. Basis states |n1, n2> are
+    indexed n1*d2 + n2, matching qt.tensor ordering.
+    """
+    U = np.zeros((d1 * d2, d1 * d2), dtype=complex)
+    for n in range(d1 + d2 - 1):
+        k_min, block = _beam_splitter_block(d1, d2, r, n)
+        idx = _sector_indices(d2, n, k_min, block.shape[0])
+        U[np.ix_(idx, idx)] = block
+    return U
+
+
+def _apply_beam_splitter(psi: np.ndarray, d1: int, d2: int, r: complex) -> np.ndarray:
+    """
+    _beam_splitter_unitary(d1, d2, r) @ psi without forming the dense unitary.
+    
+    Each total-photon sector's amplitudes are gathered, multiplied by that
+    sector's m x m block and scattered back, so the work is the sum of m^2
+    over sectors rather than (d1*d2)^2.
+    """
+    out = np.zeros(d1 * d2, dtype=complex)
+    for n in range(d1 + d2 - 1):
+        k_min, block = _beam_splitter_block(d1, d2, r, n)
+        idx = _sector_indices(d2, n, k_min, block.shape[0])
+        out[idx] = block @ psi[idx]
+    return out
+
+
+# Operators are keyed on parameters rounded to 14 digits so that equal gates built
+# from slightly different float arithmetic share an entry. Entries are dense
+# (d1*d2)^2 matrices, so the cache is kept small.
+_OPERATOR_KEY_DIGITS = 14
+
+
+@lru_cache(maxsize=16)
+def _cached_beam_splitter_op(dim1: int, dim2: int, r_real: float, r_imag: float) -> qt.Qobj:
+    """Beam splitter Qobj for one (dims, r) key; see BeamSplitter.get_operator."""
+    bs_op = _beam_splitter_unitary(dim1, dim2, complex(r_real, r_imag))
+    return qt.Qobj(bs_op, dims=[[dim1, dim2], [dim1, dim2]])
+
+
+@lru_cache(maxsize=64)
+def _phase_shift_diagonal(dimensions: tuple, mode: int, phase: float) -> np.ndarray:
+    """Diagonal of exp(i*φ*n_mode) over the full tensor-product basis."""
+    stride = int(np.prod(dimensions[mode + 1:], dtype=np.int64))
+    n_mode = (np.arange(int(np.prod(dimensions, dtype=np.int64))) // stride) % dimensions[mode]
+    diag = np.exp(1j * phase * n_mode)
+    diag.setflags(write=False)  # shared by every caller through the cache
+    return diag
+
+
+@lru_cache(maxsize=64)
+def _cached_phase_shift_op(dimensions: tuple, mode: int, phase: float) -> qt.Qobj:
+    """Phase shift Qobj for one (dims, mode, phase) key; see PhaseShift.get_operator."""
+    # exp(i*φ*n) is diagonal in the Fock basis: store it as one, no expm/tensor
+    dims = list(dimensions)
+    return qt.qdiags(_phase_shift_diagonal(dimensions, mode, phase), 0, dims=[dims, dims])
+
+
+def interferometer_output_state(mode_matrix: np.ndarray, photon_numbers: List[int], cutoff: int) -> qt.Qobj:
+    """
+    Apply a linear-optical network to a Fock state in one step.
+    
+    mode_matrix S describes the whole network by a_j† -> sum_k S[k, j] a_k†
+    (see BeamSplitter.mode_matrix and PhaseShift.mode_matrix; a chain composes
+    as S_last @ ... @ S_first). The output is prod_j (sum_k S[k, j] a_k†)^n_j
+    / sqrt(n_j!) |0>, expanded one creation operator at a time on a tensor of
+    monomial coefficients, so no Fock-space operator is materialized. It is
+    exact as long as cutoff exceeds the total photon number.
+    """
+    num_modes = len(photon_numbers)
+    coeffs = np.zeros((cutoff,) * num_modes, dtype=complex)
+    coeffs[(0,) * num_modes] = 1.0
+    
+    for j, n_j in enumerate(photon_numbers):
+        for _ in range(n_j):
+            # Multiply the polynomial by sum_k S[k, j] a_k†: shift along each axis k
+            raised = np.zeros_like(coeffs)
+            for k in range(num_modes):
+                src = [slice(None)] * num_modes
+                dst = [slice(None)] * num_modes
+                src[k], dst[k] = slice(0, cutoff - 1), slice(1, cutoff)
+                raised[tuple(dst)] += mode_matrix[k, j] * coeffs[tuple(src)]
+            coeffs = raised
+    
+    # (a†)^k |0> = sqrt(k!) |k>, and each input mode carries 1/sqrt(n_j!)
+    log_fact = np.cumsum(np.log(np.maximum(np.arange(cutoff), 1)))
+    weight = np.zeros((cutoff,) * num_modes)
+    for k in range(num_modes):
+        shape = [1] * num_modes
+        shape[k] = cutoff
+        weight = weight + 0.5 * log_fact.reshape(shape)
+    weight -= 0.5 * sum(log_fact[n] for n in photon_numbers)
+    
+    amps = (coeffs * np.exp(weight)).reshape(-1, 1)
+    return qt.Qobj(amps, dims=[[cutoff] * num_modes, [1] * num_modes])
+
+
 class OperationType(Enum):
     """Enumeration of quantum operation types."""
     BEAM_SPLITTER = "beam_splitter"
@@ -134,30 +266,49 @@ class BeamSplitter(QuantumOperation):
         mode1, mode2 = self.target_modes
         dim1, dim2 = dimensions[mode1], dimensions[mode2]
         
-        # Create beam splitter operator for two modes
-        a1 = qt.destroy(dim1)
-        a2 = qt.destroy(dim2)
-        
-        t = np.sqrt(self.transmittance)
         r = np.sqrt(self.reflectance) * np.exp(1j * self.phase)
         
-        # Beam splitter Hamiltonian (interaction picture)
-        H_bs = 1j * (r * qt.tensor(a1.dag(), a2) - np.conj(r) * qt.tensor(a1, a2.dag()))
-        
-        # For small angle approximation or exact evolution
-        # For now, use displacement operator approximation
-        bs_op = (-1j * H_bs).expm()
+        # exp(-i H_bs) for the interaction-picture Hamiltonian
+        # H_bs = i(r a1†a2 - r* a1 a2†), built sector by sector and shared
+        # between equal beam splitters
+        return _cached_beam_splitter_op(dim1, dim2,
+                                        round(r.real, _OPERATOR_KEY_DIGITS),
+                                        round(r.imag, _OPERATOR_KEY_DIGITS))
+    
+    def mode_matrix(self, num_modes: int) -> np.ndarray:
+        """
+        Single-photon (mode-space) matrix of get_operator's unitary.
         
-        return bs_op
+        exp(G) with G = r a1†a2 - r* a1 a2† maps a1† -> cos|r| a1† - (r*/|r|) sin|r| a2†
+        and a2† -> (r/|r|) sin|r| a1† + cos|r| a2†, embedded in a num_modes identity.
+        """
+        mode1, mode2 = self.target_modes
+        r = np.sqrt(self.reflectance) * np.exp(1j * self.phase)
+        theta = abs(r)
+        u = r / theta if theta > 0 else 1.0
+        
+        S = np.eye(num_modes, dtype=complex)
+        S[mode1, mode1] = S[mode2, mode2] = np.cos(theta)
+        S[mode1, mode2] = u * np.sin(theta)
+        S[mode2, mode1] = -np.conj(u) * np.sin(theta)
+        return S
     
     def apply_to_state(self, state: QuantumState) -> QuantumState:
         """Apply beam splitter to quantum state."""
         from .states import QuantumState
         
-        # Get the operator and apply it
-        op = self.get_operator(state.dimensions)
         input_qobj = state.to_qobj()
-        output_qobj = op * input_qobj
+        mode1, mode2 = self.target_modes
+        dim1, dim2 = state.dimensions[mode1], state.dimensions[mode2]
+        if input_qobj.isket and list(state.dimensions) == [dim1, dim2]:
+            # Two-mode ket: apply the unitary sector by sector
+            r = np.sqrt(self.reflectance) * np.exp(1j * self.phase)
+            psi = np.ascontiguousarray(input_qobj.full().ravel(), dtype=np.complex128)
+            output_qobj = qt.Qobj(_apply_beam_splitter(psi, dim1, dim2, complex(r)),
+                                  dims=input_qobj.dims)
+        else:
+            # Get the operator and apply it
+            output_qobj = self.get_operator(state.dimensions) * input_qobj
         
         # Create new state with transformed quantum object
         # This is a simplified implementation - in practice, we'd need
@@ -205,31 +356,26 @@ class PhaseShift(QuantumOperation):
         )
     
     def get_operator(self, dimensions: List[int]) -> qt.Qobj:
-        """Get the phase shift operator."""
-        mode = self.target_modes[0]
-        dim = dimensions[mode]
-        
-        # Phase shift operator exp(i*φ*n)
-        n_op = qt.num(dim)
-        phase_op = (1j * self.phase * n_op).expm()
-        
-        # If multi-mode system, tensor with identity on other modes
-        if len(dimensions) > 1:
-            operators = []
-            for i, d in enumerate(dimensions):
-                if i == mode:
-                    operators.append(phase_op)
-                else:
-                    operators.append(qt.qeye(d))
-            phase_op = qt.tensor(*operators)
-        
-        return phase_op
+        """Get the phase shift operator (shared between equal phase shifts)."""
+        return _cached_phase_shift_op(tuple(dimensions), self.target_modes[0],
+                                      round(self.phase, _OPERATOR_KEY_DIGITS))
+    
+    def mode_matrix(self, num_modes: int) -> np.ndarray:
+        """Single-photon (mode-space) matrix of exp(i*φ*n): a† -> exp(iφ) a† on the target mode."""
+        S = np.eye(num_modes, dtype=complex)
+        S[self.target_modes[0], self.target_modes[0]] = np.exp(1j * self.phase)
+        return S
     
     def apply_to_state(self, state: QuantumState) -> QuantumState:
         """Apply phase shift to quantum state."""
-        op = self.get_operator(state.dimensions)
         input_qobj = state.to_qobj()
-        output_qobj = op * input_qobj
+        if input_qobj.isket:
+            # Diagonal operator: scale each amplitude instead of a matrix product
+            diag = _phase_shift_diagonal(tuple(state.dimensions), self.target_modes[0],
+                                         round(self.phase, _OPERATOR_KEY_DIGITS))
+            output_qobj = qt.Qobj(diag * input_qobj.full().ravel(), dims=input_qobj.dims)
+        else:
+            output_qobj = self.get_operator(state.dimensions) * input_qobj
         
         # Create transformed state (simplified implementation)
         class TransformedState(QuantumState):
@@ -183,7 +183,9 @@ class QuantumSimulator:
         # Apply as unitary evolution (most quantum optics operations are unitary)
         self.current_state = operation_matrix * self.current_state
         
-        self.intermediate_states.append(self.current_state.copy())
+        # The product is a fresh Qobj that is only ever replaced, never modified,
+        # so it can be recorded without a defensive copy
+        self.intermediate_states.append(self.current_state)
     
     def _perform_measurement(self, measurement: Measurement) -> MeasurementResult:
         """Perform a quantum measurement."""
@@ -2,6 +2,8 @@
 Quantum state representations and manipulations.
 """
 
+from functools import lru_cache
+
 import numpy as np
 from typing import Optional, List, Dict, Any, Union
 from abc import ABC, abstractmethod
@@ -19,6 +21,16 @@ class StateType(Enum):
     ENTANGLED = "entangled"
 
 
+@lru_cache(maxsize=64)
+def _fock_ket(dimensions: tuple, photon_numbers: tuple) -> qt.Qobj:
+    """Fock ket for one (dims, photon numbers) key, shared by equal FockStates."""
+    if len(photon_numbers) == 1:
+        return qt.basis(dimensions[0], photon_numbers[0])
+    # Single contiguous ket with one nonzero amplitude at the composite
+    # index, instead of tensoring one max_dim ket per mode
+    return qt.basis(list(dimensions), list(photon_numbers))
+
+
 class QuantumState(ABC):
     """
     Abstract base class for quantum states in the AgenticQuantum system.
@@ -191,11 +203,7 @@ class FockState(QuantumState):
     def to_qobj(self) -> qt.Qobj:
         """Convert to QuTiP quantum object."""
         if self._qobj is None:
-            if len(self.photon_numbers) == 1:
-                self._qobj = qt.basis(self.max_dim, self.photon_numbers[0])
-            else:
-                basis_states = [qt.basis(self.max_dim, n) for n in self.photon_numbers]
-                self._qobj = qt.tensor(*basis_states)
+            self._qobj = _fock_ket(tuple(self.dimensions), tuple(self.photon_numbers))
         return self._qobj
     
     def to_density_matrix(self) -> qt.Qobj:
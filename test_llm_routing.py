@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the local chat/design routing that runs before the LLM is asked
+
+route_user_message settles unambiguous messages with regexes (_fast_route) and
+only sends the rest to the LLM. A question that proposes an edit must reach the
+LLM instead of being answered locally as chat.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from llm_designer import LLMDesigner
+
+
+class RecordingLLM:
+    """LLM client that records routing prompts and always answers DESIGN."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def predict(self, prompt):
+        self.prompts.append(prompt)
+        return "DESIGN"
+
+
+def make_designer():
+    return LLMDesigner(RecordingLLM(), use_memory=False, use_simulation=False)
+
+
+def test_design_verbs_route_locally():
+    designer = make_designer()
+    for query in ("Design a Mach-Zehnder interferometer", "  create a bell state experiment",
+                  "Set up a HOM dip", "build a squeezed light source"):
+        assert designer._fast_route(query)[0] == 'design', query
+
+
+def test_plain_questions_route_to_chat():
+    designer = make_designer()
+    for query in ("What is quantum entanglement?", "Why does this work?",
+                  "How can I build this in real life?", "Where can I buy these components?",
+                  "Explain the physics"):
+        assert designer._fast_route(query)[0] == 'chat', query
+
+
+def test_questions_proposing_edits_defer_to_llm():
+    designer = make_designer()
+    for query in ("How can we make it more sensitive?", "What about increasing the pump power?",
+                  "What if we decrease the beam splitter reflectivity?",
+                  "How about switching to a PBS?", "What if we turn it into a Sagnac loop?",
+                  "Why not convert to a fiber setup?", "What if we swapped the mirrors?",
+                  "How would you transform this into a HOM experiment?",
+                  "What if the phase were modified?"):
+        assert designer._fast_route(query) is None, query
+
+
+def test_numbered_component_edits_route_to_design():
+    designer = make_designer()
+    for query in ("Please move component 3 left", "increase the power of #2",
+                  "swap components 1 and 2"):
+        assert designer._fast_route(query)[0] == 'design', query
+    assert designer._fast_route("Please move the laser left") is None
+
+
+def test_route_user_message_calls_llm_only_when_deferred():
+    designer = make_designer()
+    assert designer.route_user_message("What is squeezing?")[0] == 'chat'
+    assert designer.llm.prompts == []
+    assert designer.route_user_message("What about increasing the pump power?")[0] == 'design'
+    assert len(designer.llm.prompts) == 1
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("LOCAL MESSAGE ROUTING")
+    print("="*70)
+
+    test_design_verbs_route_locally()
+    print("✓ Design verbs route to design without the LLM")
+    test_plain_questions_route_to_chat()
+    print("✓ Plain questions route to chat without the LLM")
+    test_questions_proposing_edits_defer_to_llm()
+    print("✓ Questions proposing an edit are left to the LLM")
+    test_numbered_component_edits_route_to_design()
+    print("✓ Edits aimed at a numbered component route to design")
+    test_route_user_message_calls_llm_only_when_deferred()
+    print("✓ route_user_message asks the LLM only for deferred messages")